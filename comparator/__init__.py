@@ -0,0 +1,4 @@
+# comparator
+#
+# Cat Kiss Fish & Shopify order comparator. The Streamlit page lives in comparator.page; the
+# cache warm-up, webhook receiver and batch client run with `python -m comparator.<module>`.
@@ -0,0 +1,396 @@
+# async_client.py
+#
+# Asyncio engine for high fan-out runs such as nightly audits. All requests of a process go
+# through one aiohttp session on one event loop, with a connection limit per upstream host.
+# Results follow the blocking helpers (same "Versand"/"shipping" filtering, same variant image
+# fallback, same errors) and are shared with them through the shared cache.
+#
+#   python -m comparator.async_client pairs.txt    # one "CKF_ORDER_ID SHOPIFY_ORDER" pair per line
+#
+# The Streamlit app submits coroutines to a background loop (get_background_loop).
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+from comparator.catkissfish_api import CATKISSFISH_ORDER_DETAIL_URL, CATKISSFISH_TOKEN_URL, CatKissFishAPIError, project_catkissfish_order
+from comparator.config import (
+    CATKISSFISH_CLIENT_ID,
+    CATKISSFISH_CLIENT_SECRET,
+    CATKISSFISH_ORDER_CACHE_TTL,
+    CATKISSFISH_TOKEN_CACHE_TTL,
+    SHOPIFY_ORDER_CACHE_TTL,
+    SHOPIFY_STORES,
+    SHOPIFY_VARIANT_IMAGE_CACHE_TTL,
+)
+from comparator.json_codec import decode_body
+from comparator.order_cache import (
+    CATKISSFISH_TOKEN_CACHE_KEY,
+    MISSING,
+    SHARED_LOCK_POLL_INTERVAL,
+    SharedClaim,
+    catkissfish_order_cache_key,
+    get_shared_cache,
+    shopify_order_cache_key,
+    shopify_variant_image_cache_key,
+)
+from comparator.order_records import split_effect_image_urls
+from comparator.revalidation import can_revalidate, conditional_headers, record_validators
+from comparator.shopify_api import ShopifyAPIError, filter_shipping_line_items, project_shopify_order, shopify_headers, shopify_url
+
+# ==========================================
+# ⚙️ Engine Settings
+# ==========================================
+
+ASYNC_MAX_CONNECTIONS = int(os.getenv("ASYNC_MAX_CONNECTIONS", "300"))
+ASYNC_CONNECTIONS_PER_HOST = int(os.getenv("ASYNC_CONNECTIONS_PER_HOST", "40"))
+ASYNC_REQUEST_TIMEOUT = 30
+ASYNC_MAX_RETRIES = 3  # Retries of a request rejected with 429 Too Many Requests
+# Threads for shared cache calls, which block (SQLite waits up to 10 s for a contended write,
+# Redis up to its socket timeout) and so never run on the event loop itself
+ASYNC_CACHE_THREADS = int(os.getenv("ASYNC_CACHE_THREADS", "16"))
+
+# ==========================================
+# 🌐 Async Upstream Client
+# ==========================================
+
+# 🌐 Async counterparts of the shopify_api / catkissfish_api fetch functions. The session is
+# created on first use and bound to the loop that made it
+class AsyncUpstreamClient:
+    def __init__(self, max_connections=ASYNC_MAX_CONNECTIONS, connections_per_host=ASYNC_CONNECTIONS_PER_HOST):
+        self.max_connections = max_connections
+        self.connections_per_host = connections_per_host
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.connections_per_host)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=ASYNC_REQUEST_TIMEOUT)
+            )
+        return self._session
+
+    # 🔁 Send a request and read its body; 429 answers are retried after their Retry-After delay
+    async def _request(self, method, url, **kwargs):
+        for attempt in range(ASYNC_MAX_RETRIES + 1):
+            async with self._get_session().request(method, url, **kwargs) as response:
+                body = await response.read()
+            if response.status != 429 or attempt == ASYNC_MAX_RETRIES:
+                return response, body
+            await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+
+    # 🛍️ GET an Admin API resource and decode it, raising ShopifyAPIError on HTTP errors
+    async def _shopify_get_json(self, store, path, description, params=None, validators=None):
+        response, body = await self._request("GET", shopify_url(store, path), headers=shopify_headers(store), params=params)
+        if response.status != 200:
+            raise ShopifyAPIError(f"HTTP Error {response.status} while fetching {description}.", body.decode("utf-8", "replace"))
+        record_validators(validators, response, path=path, params=params)
+        return decode_body(body, "shopify-" + path.split("/")[0].removesuffix(".json"))
+
+    async def fetch_shopify_orders(self, store, order_number, validators=None):
+        data = await self._shopify_get_json(store, "orders.json", "Shopify order details", params={"name": order_number}, validators=validators)
+        return data.get("orders", [])
+
+    # 🛍️ Resolve the image of a variant, falling back to the product's default image
+    async def fetch_shopify_variant_image_url(self, store, variant_id, validators=None):
+        data = await self._shopify_get_json(store, f"variants/{variant_id}.json", f"Shopify variant {variant_id} details", validators=validators)
+        variant = data.get("variant", {})
+        image_id = variant.get("image_id")
+        product_id = variant.get("product_id")
+        if image_id and product_id:
+            data = await self._shopify_get_json(store, f"products/{product_id}/images/{image_id}.json", f"Shopify image {image_id} details", validators=validators)
+            return data.get("image", {}).get("src")
+        if product_id:
+            data = await self._shopify_get_json(store, f"products/{product_id}.json", f"Shopify product {product_id} details", validators=validators)
+            images = data.get("product", {}).get("images", [])
+            if images:
+                return images[0].get("src")  # Return the first image as default
+        return None
+
+    # 🛍️ True only when every recorded resource answers 304 Not Modified
+    async def shopify_resources_unchanged(self, store, validators):
+        if not can_revalidate(validators):
+            return False
+        for entry in validators:
+            headers = {**shopify_headers(store), **conditional_headers(entry)}
+            try:
+                response, _ = await self._request("GET", shopify_url(store, entry["path"]), headers=headers, params=entry.get("params"))
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return False
+            if response.status != 304:
+                return False
+        return True
+
+    # 🐟 Obtain a client token (valid for about 2 hours)
+    async def fetch_catkissfish_access_token(self, client_id, client_secret):
+        payload = {
+            "grant_type": "client_credentials",
+            "client_id": client_id,
+            "client_secret": client_secret
+        }
+        response, body = await self._request("POST", CATKISSFISH_TOKEN_URL, data=payload)
+        if response.status != 200:
+            raise CatKissFishAPIError(f"HTTP Error {response.status} while obtaining Cat Kiss Fish token.", response_text=body.decode("utf-8", "replace"))
+        resp_json = decode_body(body, "catkissfish-token")
+        if resp_json.get("code") not in [200, 0]:
+            raise CatKissFishAPIError(f"Error obtaining Cat Kiss Fish token: {resp_json.get('msg')}", response_json=resp_json)
+        return resp_json["data"]["client_token"]
+
+    def _catkissfish_headers(self, access_token):
+        return {"Content-Type": "application/json;charset=utf-8", "access_token": access_token}
+
+    # 🐟 Fetch the full details of one order
+    async def fetch_catkissfish_order_details(self, order_id, access_token, validators=None):
+        response, body = await self._request("GET", CATKISSFISH_ORDER_DETAIL_URL, headers=self._catkissfish_headers(access_token), params={"id": order_id})
+        if response.status != 200:
+            raise CatKissFishAPIError(f"HTTP Error {response.status} while fetching Cat Kiss Fish order details.", response_text=body.decode("utf-8", "replace"))
+        resp_json = decode_body(body, "catkissfish-order")
+        if resp_json.get("code") not in [200, 0]:
+            raise CatKissFishAPIError(f"Cat Kiss Fish API Error: {resp_json.get('message')}", response_json=resp_json)
+        record_validators(validators, response)
+        return resp_json["data"]
+
+    # 🐟 True only when the order answers 304 Not Modified
+    async def catkissfish_order_unchanged(self, order_id, access_token, validators):
+        if not can_revalidate(validators):
+            return False
+        headers = {**self._catkissfish_headers(access_token), **conditional_headers(validators[0])}
+        try:
+            response, _ = await self._request("GET", CATKISSFISH_ORDER_DETAIL_URL, headers=headers, params={"id": order_id})
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+        return response.status == 304
+
+# ==========================================
+# 📦 Cached Loads (Same Semantics as the App's Lookups)
+# ==========================================
+
+_cache_executor = ThreadPoolExecutor(max_workers=ASYNC_CACHE_THREADS, thread_name_prefix="shared-cache")
+
+# 🗄️ Run a blocking shared cache call off the loop, so a slow one stalls only its own request
+async def in_cache_thread(function, *args):
+    return await asyncio.get_running_loop().run_in_executor(_cache_executor, function, *args)
+
+# 🐟 Client token, shared with the app and the warm-up through the shared cache. Refreshed under
+# the same cross-process lock as order_cache.get_or_create_shared
+async def load_catkissfish_access_token(client, client_id, client_secret):
+    claim = SharedClaim(await in_cache_thread(get_shared_cache), CATKISSFISH_TOKEN_CACHE_KEY)
+    while not await in_cache_thread(claim.poll):
+        await asyncio.sleep(SHARED_LOCK_POLL_INTERVAL)
+    try:
+        if claim.value is MISSING:
+            access_token = await client.fetch_catkissfish_access_token(client_id, client_secret)
+            await in_cache_thread(claim.store, access_token, CATKISSFISH_TOKEN_CACHE_TTL)
+        return claim.value
+    finally:
+        await in_cache_thread(claim.release)
+
+# 🐟 Projected Cat Kiss Fish order: fresh cache entry, revalidated entry, or a new fetch
+async def load_catkissfish_order(client, order_id, access_token):
+    shared_cache = await in_cache_thread(get_shared_cache)
+    cache_key = catkissfish_order_cache_key(order_id)
+    cached_order = await in_cache_thread(shared_cache.get, cache_key)
+    if cached_order is not MISSING:
+        return cached_order
+    stale_entry = await in_cache_thread(shared_cache.get_stale, cache_key)
+    if stale_entry is not MISSING and await client.catkissfish_order_unchanged(order_id, access_token, stale_entry[1]):
+        await in_cache_thread(shared_cache.touch, cache_key, CATKISSFISH_ORDER_CACHE_TTL)
+        return stale_entry[0]
+    validators = []
+    catkissfish_order = project_catkissfish_order(await client.fetch_catkissfish_order_details(order_id, access_token, validators))
+    await in_cache_thread(shared_cache.set, cache_key, catkissfish_order, CATKISSFISH_ORDER_CACHE_TTL, validators)
+    return catkissfish_order
+
+# 🛍️ Projected Shopify orders without "Versand"/"shipping" line items; raises ShopifyAPIError
+# with the app's messages when nothing is left to compare
+async def load_shopify_orders(client, store, store_prefix, order_number):
+    shared_cache = await in_cache_thread(get_shared_cache)
+    cache_key = shopify_order_cache_key(store_prefix, order_number)
+    cached_orders = await in_cache_thread(shared_cache.get, cache_key)
+    if cached_orders is not MISSING:
+        return cached_orders
+    stale_entry = await in_cache_thread(shared_cache.get_stale, cache_key)
+    if stale_entry is not MISSING and await client.shopify_resources_unchanged(store, stale_entry[1]):
+        await in_cache_thread(shared_cache.touch, cache_key, SHOPIFY_ORDER_CACHE_TTL)
+        return stale_entry[0]
+    validators = []
+    orders = await client.fetch_shopify_orders(store, order_number, validators)
+    if not orders:
+        raise ShopifyAPIError(f"No Shopify order found with Order Number: {order_number}")
+    filtered_orders = filter_shipping_line_items(orders)
+    if not filtered_orders:
+        raise ShopifyAPIError(f"All products in Shopify order {order_number} are excluded based on filtering criteria.")
+    projected_orders = [project_shopify_order(order) for order in filtered_orders]
+    await in_cache_thread(shared_cache.set, cache_key, projected_orders, SHOPIFY_ORDER_CACHE_TTL, validators)
+    return projected_orders
+
+# 🛍️ Variant image URL, falling back to the product's default image
+async def load_shopify_variant_image(client, store, store_prefix, variant_id):
+    shared_cache = await in_cache_thread(get_shared_cache)
+    cache_key = shopify_variant_image_cache_key(store_prefix, variant_id)
+    cached_image_url = await in_cache_thread(shared_cache.get, cache_key)
+    if cached_image_url is not MISSING:
+        return cached_image_url
+    stale_entry = await in_cache_thread(shared_cache.get_stale, cache_key)
+    if stale_entry is not MISSING and await client.shopify_resources_unchanged(store, stale_entry[1]):
+        await in_cache_thread(shared_cache.touch, cache_key, SHOPIFY_VARIANT_IMAGE_CACHE_TTL)
+        return stale_entry[0]
+    validators = []
+    image_url = await client.fetch_shopify_variant_image_url(store, variant_id, validators)
+    await in_cache_thread(shared_cache.set, cache_key, image_url, SHOPIFY_VARIANT_IMAGE_CACHE_TTL, validators)
+    return image_url
+
+# 📦 Both orders of a pair plus the variant images of the Shopify order
+async def load_order_pair(client, stores, access_token, cat_order, shop_order, store_prefix):
+    store = stores[store_prefix]
+    catkissfish_order, shopify_orders = await asyncio.gather(
+        load_catkissfish_order(client, cat_order, access_token),
+        load_shopify_orders(client, store, store_prefix, shop_order)
+    )
+    variant_ids = list(dict.fromkeys(item["variant_id"] for item in shopify_orders[0]["line_items"] if item.get("variant_id")))
+    image_urls = await asyncio.gather(*(load_shopify_variant_image(client, store, store_prefix, variant_id) for variant_id in variant_ids))
+    return {
+        "catkissfish_order": catkissfish_order,
+        "shopify_orders": shopify_orders,
+        "variant_images": dict(zip(variant_ids, image_urls))
+    }
+
+# 📦 Load many pairs at once, yielding (pair, result, error) as each pair completes
+async def load_order_pairs(client, stores, access_token, order_pairs):
+    async def load(pair):
+        try:
+            return pair, await load_order_pair(client, stores, access_token, *pair), None
+        except Exception as e:
+            return pair, None, e
+
+    for completed in asyncio.as_completed([load(pair) for pair in order_pairs]):
+        yield await completed
+
+# 🖼️ Effect and variant image URLs of a loaded pair
+def order_pair_image_urls(result):
+    effect_urls = [
+        url
+        for design in result["catkissfish_order"].get("orderDesignHistoryList", [])
+        for url in split_effect_image_urls(design.get("effectImageUrl"))
+    ]
+    return effect_urls + [url for url in result["variant_images"].values() if url]
+
+# 🖼️ Download and hash a loaded pair's images into the in-process hash cache (blocking; runs in
+# the loop's executor), so opening the pair scores its designs without waiting for downloads
+def hash_order_pair_images(result):
+    from comparator.image_similarity import hash_images  # Pillow is only loaded once images are compared
+
+    hash_images(order_pair_image_urls(result))
+
+# 📦 Load pairs only to fill the shared cache; returns how many failed. When a queue is given,
+# every finished pair is also put on it as (pair, error), error being None on success. With
+# hash_images, each loaded pair's design images are hashed as well
+async def prefetch_order_pairs(client, stores, access_token, order_pairs, completions=None, hash_images=False):
+    failures = 0
+    hashing = []
+    async for pair, result, error in load_order_pairs(client, stores, access_token, order_pairs):
+        failures += error is not None
+        if completions is not None:
+            completions.put((pair, error))
+        if hash_images and result is not None:
+            hashing.append(asyncio.get_running_loop().run_in_executor(None, hash_order_pair_images, result))
+    await asyncio.gather(*hashing, return_exceptions=True)
+    return failures
+
+# 🐟 Load many Cat Kiss Fish orders at once; returns {order_id: order or exception}
+async def load_catkissfish_orders(client, access_token, order_ids):
+    results = await asyncio.gather(*(load_catkissfish_order(client, order_id, access_token) for order_id in order_ids), return_exceptions=True)
+    return dict(zip(order_ids, results))
+
+# ==========================================
+# 🧵 Background Event Loop
+# ==========================================
+
+# 🧵 An event loop running in a daemon thread, with one client bound to it; blocking code
+# (the Streamlit script) hands it coroutines and gets concurrent.futures.Future objects back
+class BackgroundLoop:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client = AsyncUpstreamClient()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="async-upstream", daemon=True)
+        self._thread.start()
+
+    def submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine, timeout=None):
+        return self.submit(coroutine).result(timeout)
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+# 🧵 The process-wide background loop
+def get_background_loop():
+    global _background_loop
+    with _background_loop_lock:
+        if _background_loop is None:
+            _background_loop = BackgroundLoop()
+        return _background_loop
+
+# ==========================================
+# 🌙 Batch Command Line
+# ==========================================
+
+# 🌙 Load every pair and print one line per pair as it completes
+async def run_batch(order_pairs, stores, client_id, client_secret):
+    started = time.monotonic()
+    failures = 0
+    async with AsyncUpstreamClient() as client:
+        access_token = await load_catkissfish_access_token(client, client_id, client_secret)
+        async for (cat_order, shop_order, store_prefix), result, error in load_order_pairs(client, stores, access_token, order_pairs):
+            if error is not None:
+                failures += 1
+                print(f"❌ {cat_order} vs {shop_order}: {error}")
+            else:
+                print(f"✅ {cat_order} vs {shop_order}: {len(result['variant_images'])} variant images")
+    elapsed = time.monotonic() - started
+    print(f"🌙 {len(order_pairs)} pairs in {elapsed:.1f}s ({len(order_pairs) / max(elapsed, 1e-9):.1f} pairs/s), {failures} failed")
+    return failures
+
+# 🌙 Read "CKF_ORDER_ID SHOPIFY_ORDER" lines; the store is the Shopify order's first letter
+def read_order_pairs(lines, stores):
+    order_pairs = []
+    for idx, line in enumerate(lines, start=1):
+        parts = line.split()
+        if not parts:
+            continue
+        if len(parts) != 2 or parts[1][0].upper() not in stores:
+            print(f"⚠️ Skipping line {idx}: '{line.strip()}'")
+            continue
+        order_pairs.append((parts[0], parts[1], parts[1][0].upper()))
+    return order_pairs
+
+def main():
+    parser = argparse.ArgumentParser(description="Load many order pairs concurrently into the shared cache.")
+    parser.add_argument("pairs", nargs="?", type=argparse.FileType("r"), default=sys.stdin, help="file of order pairs (default: stdin)")
+    args = parser.parse_args()
+
+    order_pairs = read_order_pairs(args.pairs, SHOPIFY_STORES)
+    failures = asyncio.run(run_batch(order_pairs, SHOPIFY_STORES, CATKISSFISH_CLIENT_ID, CATKISSFISH_CLIENT_SECRET))
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
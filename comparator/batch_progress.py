@@ -0,0 +1,71 @@
+# batch_progress.py
+#
+# Progress of a batch of order pairs loading on the background loop. The loop puts each
+# finished pair on a completion queue; the page drains it whenever it redraws the status table.
+
+import itertools
+import queue
+import time
+
+# ==========================================
+# 📡 Batch Progress
+# ==========================================
+
+STATUS_PENDING = "⏳ Loading"
+STATUS_READY = "✅ Ready"
+STATUS_FAILED = "❌ Failed"
+
+_batch_ids = itertools.count(1)
+
+# 📡 Per-pair status of one batch, updated from its completion queue
+class BatchProgress:
+    def __init__(self, order_pairs):
+        self.batch_id = next(_batch_ids)  # Distinguishes batches in widget keys
+        self.order_pairs = list(order_pairs)
+        self.completions = queue.Queue()
+        self.started_at = time.monotonic()
+        self.finished_at = None
+        self.completed = 0
+        self.errors = 0
+        self._statuses = {pair: (STATUS_PENDING, None, None) for pair in self.order_pairs}  # pair -> (status, seconds, error)
+
+    # 📡 Apply every completion that arrived since the last call
+    def drain(self):
+        while True:
+            try:
+                pair, error = self.completions.get_nowait()
+            except queue.Empty:
+                break
+            elapsed = time.monotonic() - self.started_at
+            self._statuses[pair] = (STATUS_FAILED, elapsed, str(error)) if error is not None else (STATUS_READY, elapsed, None)
+            self.completed += 1
+            self.errors += error is not None
+        if self.finished_at is None and self.completed >= len(self.order_pairs):
+            self.finished_at = time.monotonic()
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def pairs_per_second(self):
+        elapsed = (self.finished_at or time.monotonic()) - self.started_at
+        return self.completed / elapsed if elapsed > 0 else 0.0
+
+    def is_completed(self, index):
+        return self._statuses[self.order_pairs[index]][0] != STATUS_PENDING
+
+    # 📡 One row per pair, in input order, for the status table
+    def rows(self):
+        rows = []
+        for idx, pair in enumerate(self.order_pairs):
+            status, seconds, error = self._statuses[pair]
+            rows.append({
+                "#": idx + 1,
+                "Cat Kiss Fish": pair[0],
+                "Shopify": pair[1],
+                "Store": pair[2],
+                "Status": status,
+                "Seconds": None if seconds is None else round(seconds, 1),
+                "Error": error or ""
+            })
+        return rows
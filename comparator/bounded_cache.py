@@ -0,0 +1,152 @@
+# bounded_cache.py
+
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+# ==========================================
+# 📏 Size Estimation
+# ==========================================
+
+# 📏 Approximate the memory held by a cached value (containers, strings and slotted records)
+def approx_size(value, _seen=None):
+    if _seen is None:
+        _seen = set()
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(approx_size(key, _seen) + approx_size(item, _seen) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approx_size(item, _seen) for item in value)
+    for slot in getattr(type(value), "__slots__", ()):
+        size += approx_size(getattr(value, slot, None), _seen)
+    return size
+
+# ==========================================
+# 🗃️ Byte-Bounded LRU/TTL Cache
+# ==========================================
+
+_MISSING = object()
+
+# 🗃️ In-process cache that evicts expired entries first, then least recently used ones,
+# so the total estimated size never exceeds max_bytes
+class BoundedCache:
+    def __init__(self, name, max_bytes, ttl):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (value, size, expires_at), least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    # 🔎 Whether a key holds an unexpired value, without counting a hit or miss
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[2] > time.monotonic()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        size = approx_size(value)
+        if size > self.max_bytes:
+            return  # Would evict everything else; leave it uncached
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + self.ttl)
+            self.current_bytes += size
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def _evict(self):
+        if self.current_bytes <= self.max_bytes:
+            return
+        now = time.monotonic()
+        for key in [key for key, (_, _, expires_at) in self._entries.items() if expires_at <= now]:
+            self._remove(key)
+            self.evictions += 1
+        while self.current_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "Cache": self.name,
+                "Entries": len(self._entries),
+                "Bytes": self.current_bytes,
+                "Budget (Bytes)": self.max_bytes,
+                "Hits": self.hits,
+                "Misses": self.misses,
+                "Evictions": self.evictions
+            }
+
+# ==========================================
+# 🧷 Process-Wide Registry and Decorator
+# ==========================================
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+# 🧷 Get or create a named cache; the registry outlives Streamlit reruns of the script
+def get_bounded_cache(name, max_bytes, ttl):
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = BoundedCache(name, max_bytes, ttl)
+        return cache
+
+# 🧷 Memoize a function in a named bounded cache; empty results (None, [], "") are not
+# cached so failed lookups are retried and their errors shown again
+def bounded_cache(name, max_bytes, ttl):
+    cache = get_bounded_cache(name, max_bytes, ttl)
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args):
+            value = cache.get(args, _MISSING)
+            if value is _MISSING:
+                value = function(*args)
+                if value:
+                    cache.set(args, value)
+            return value
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+# 📊 Stats of every registered cache, for the sidebar view
+def all_cache_stats():
+    with _caches_lock:
+        caches = list(_caches.values())
+    return [cache.stats() for cache in caches]
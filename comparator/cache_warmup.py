@@ -0,0 +1,210 @@
+# cache_warmup.py
+#
+# Prefetches recent orders into the shared cache after a deploy so operators do not start
+# on cold caches. Started in the background by the Procfile web process:
+#
+#   python -m comparator.cache_warmup            # last WARMUP_HOURS hours (default 24)
+#   python -m comparator.cache_warmup --hours 6
+
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from comparator.catkissfish_api import (
+    fetch_catkissfish_access_token,
+    fetch_catkissfish_order_details,
+    fetch_recent_catkissfish_order_ids,
+    project_catkissfish_order,
+)
+from comparator.config import CATKISSFISH_CLIENT_ID, CATKISSFISH_CLIENT_SECRET, CATKISSFISH_TOKEN_CACHE_TTL, SHOPIFY_STORES
+from comparator.order_cache import (
+    CATKISSFISH_TOKEN_CACHE_KEY,
+    MISSING,
+    WARMUP_PROGRESS_CACHE_KEY,
+    catkissfish_order_cache_key,
+    get_or_create_shared,
+    get_shared_cache,
+    shopify_order_cache_key,
+    shopify_variant_image_cache_key,
+)
+from comparator.shopify_api import (
+    fetch_recent_shopify_orders,
+    fetch_shopify_variant_image_url,
+    filter_shipping_line_items,
+    project_shopify_order,
+)
+
+# ==========================================
+# ⚙️ Warm-Up Settings
+# ==========================================
+
+WARMUP_HOURS = float(os.getenv("WARMUP_HOURS", "24"))
+# Requests per second per upstream, leaving most of Shopify's 2/s budget to operators
+WARMUP_REQUESTS_PER_SECOND = float(os.getenv("WARMUP_REQUESTS_PER_SECOND", "1"))
+WARMUP_CACHE_TTL = 3600  # Long enough to cover the first hour of operator work
+WARMUP_PROGRESS_TTL = 24 * 3600
+WARMUP_PROGRESS_PUBLISH_INTERVAL = 1.0  # Seconds between progress writes, also while waiting on a slow upstream
+# A running entry not updated for this long belongs to a warm-up process that died
+WARMUP_PROGRESS_STALE_AFTER = 10 * WARMUP_PROGRESS_PUBLISH_INTERVAL
+
+# ==========================================
+# 📊 Progress Reporting
+# ==========================================
+
+# 📊 Counters shared by the store threads and published to the shared cache for the app. A
+# heartbeat keeps publishing while the warm-up runs, so the app can tell a stalled entry from a
+# live one by its updated_at
+class WarmupProgress:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = {
+            "status": "running",
+            "started_at": time.time(),
+            "updated_at": time.time(),
+            "orders_total": 0,
+            "orders_done": 0,
+            "images_total": 0,
+            "images_done": 0,
+            "errors": 0
+        }
+        self._last_publish = 0.0
+        self.publish()
+        threading.Thread(target=self._heartbeat, name="warmup-progress", daemon=True).start()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(WARMUP_PROGRESS_PUBLISH_INTERVAL)
+            with self._lock:
+                if self.state["status"] != "running":
+                    return
+                if time.monotonic() - self._last_publish >= WARMUP_PROGRESS_PUBLISH_INTERVAL:
+                    self.state["updated_at"] = time.time()
+                    self.publish()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                self.state[name] += count
+            self.state["updated_at"] = time.time()
+            if time.monotonic() - self._last_publish >= WARMUP_PROGRESS_PUBLISH_INTERVAL:
+                self.publish()
+
+    def finish(self):
+        with self._lock:
+            self.state["status"] = "done"
+            self.state["updated_at"] = time.time()
+            self.publish()
+
+    def publish(self):
+        self._last_publish = time.monotonic()
+        get_shared_cache().set(WARMUP_PROGRESS_CACHE_KEY, self.state, WARMUP_PROGRESS_TTL)
+
+# ⏳ Spaces out calls to one upstream
+class Throttle:
+    def __init__(self, requests_per_second):
+        self.interval = 1 / requests_per_second if requests_per_second > 0 else 0
+        self._next_call = 0.0
+
+    def wait(self):
+        delay = self._next_call - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next_call = max(self._next_call, time.monotonic()) + self.interval
+
+# ==========================================
+# 🔥 Warm-Up Stages
+# ==========================================
+
+# 🛍️ Cache recent orders of one store, then resolve their variant images
+def warm_shopify_store(store_prefix, store, since, progress):
+    shared_cache = get_shared_cache()
+    throttle = Throttle(WARMUP_REQUESTS_PER_SECOND)
+    throttle.wait()
+    try:
+        orders = filter_shipping_line_items(fetch_recent_shopify_orders(store, since, fields=None))
+    except Exception as e:
+        print(f"⚠️ Could not list recent orders of store '{store_prefix}': {e}")
+        progress.add(errors=1)
+        return
+    progress.add(orders_total=len(orders))
+
+    variant_ids = []
+    for order in orders:
+        projected_order = project_shopify_order(order)
+        shared_cache.set(shopify_order_cache_key(store_prefix, order.get("name", "")), [projected_order], WARMUP_CACHE_TTL)
+        variant_ids.extend(item["variant_id"] for item in projected_order["line_items"] if item.get("variant_id"))
+        progress.add(orders_done=1)
+
+    variant_ids = list(dict.fromkeys(variant_ids))
+    progress.add(images_total=len(variant_ids))
+    for variant_id in variant_ids:
+        cache_key = shopify_variant_image_cache_key(store_prefix, variant_id)
+        if shared_cache.get(cache_key) is MISSING:
+            throttle.wait()
+            try:
+                validators = []
+                image_url = fetch_shopify_variant_image_url(store, variant_id, validators)
+                shared_cache.set(cache_key, image_url, WARMUP_CACHE_TTL, validators)
+            except Exception as e:
+                print(f"⚠️ Could not resolve variant {variant_id} image for store '{store_prefix}': {e}")
+                progress.add(errors=1)
+        progress.add(images_done=1)
+
+# 🐟 Cache the Cat Kiss Fish token and, when a list endpoint is configured, recent orders
+def warm_catkissfish(progress):
+    shared_cache = get_shared_cache()
+    throttle = Throttle(WARMUP_REQUESTS_PER_SECOND)
+    if not CATKISSFISH_CLIENT_ID or not CATKISSFISH_CLIENT_SECRET:
+        return
+    try:
+        access_token = get_or_create_shared(
+            CATKISSFISH_TOKEN_CACHE_KEY,
+            CATKISSFISH_TOKEN_CACHE_TTL,
+            lambda: fetch_catkissfish_access_token(CATKISSFISH_CLIENT_ID, CATKISSFISH_CLIENT_SECRET)
+        )
+        order_ids = fetch_recent_catkissfish_order_ids(access_token)
+    except Exception as e:
+        print(f"⚠️ Could not warm up Cat Kiss Fish: {e}")
+        progress.add(errors=1)
+        return
+    progress.add(orders_total=len(order_ids))
+    for order_id in order_ids:
+        throttle.wait()
+        try:
+            validators = []
+            catkissfish_order = project_catkissfish_order(fetch_catkissfish_order_details(order_id, access_token, validators=validators))
+            shared_cache.set(catkissfish_order_cache_key(order_id), catkissfish_order, WARMUP_CACHE_TTL, validators)
+        except Exception as e:
+            print(f"⚠️ Could not fetch Cat Kiss Fish order {order_id}: {e}")
+            progress.add(errors=1)
+        progress.add(orders_done=1)
+
+# 🔥 Warm every upstream in parallel; each one is throttled on its own
+def run_warmup(hours):
+    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat(timespec="seconds")
+    progress = WarmupProgress()
+    threads = [threading.Thread(target=warm_catkissfish, args=(progress,), name="warmup-catkissfish")]
+    for store_prefix, store in SHOPIFY_STORES.items():
+        if store['url'] and store['access_token']:
+            threads.append(threading.Thread(target=warm_shopify_store, args=(store_prefix, store, since, progress), name=f"warmup-{store_prefix}"))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    progress.finish()
+    state = progress.state
+    print(
+        f"🔥 Cache warm-up finished in {time.time() - state['started_at']:.0f}s: "
+        f"{state['orders_done']} orders, {state['images_done']} images, {state['errors']} errors"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Prefetch recent orders into the shared cache.")
+    parser.add_argument("--hours", type=float, default=WARMUP_HOURS, help="how far back to prefetch orders")
+    args = parser.parse_args()
+    run_warmup(args.hours)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# catkissfish_api.py
+
+import os
+
+import requests
+
+from comparator.json_codec import decode_response
+from comparator.revalidation import can_revalidate, conditional_headers, record_validators
+
+# ==========================================
+# 🌐 Cat Kiss Fish API Endpoints
+# ==========================================
+
+CATKISSFISH_TOKEN_URL = "https://www.catkissfish.com:8443/oauth2/client_token"
+CATKISSFISH_ORDER_DETAIL_URL = "https://www.catkissfish.com:8443/open/api/order/v1/order/detail"
+
+# Optional order list endpoint (not part of the open API we use elsewhere). When set, the URL,
+# including any query string, is fetched with the client token and must return orders with an "id"
+CATKISSFISH_ORDER_LIST_URL = os.getenv("CATKISSFISH_ORDER_LIST_URL")
+
+# ==========================================
+# ⚠️ Errors
+# ==========================================
+
+# ⚠️ Raised for failed calls; keeps the raw response so callers can show it for debugging
+class CatKissFishAPIError(Exception):
+    def __init__(self, message, response_text=None, response_json=None):
+        super().__init__(message)
+        self.response_text = response_text
+        self.response_json = response_json
+
+# ==========================================
+# 🚀 Functions to Interact with the Cat Kiss Fish API
+# ==========================================
+
+# 🐟 Obtain a client token (valid for about 2 hours)
+def fetch_catkissfish_access_token(client_id, client_secret, timeout=30):
+    payload = {
+        "grant_type": "client_credentials",
+        "client_id": client_id,
+        "client_secret": client_secret
+    }
+    response = requests.post(CATKISSFISH_TOKEN_URL, data=payload, timeout=timeout)
+    if response.status_code != 200:
+        raise CatKissFishAPIError(f"HTTP Error {response.status_code} while obtaining Cat Kiss Fish token.", response_text=response.text)
+    resp_json = decode_response(response, "catkissfish-token")
+    if resp_json.get("code") not in [200, 0]:
+        raise CatKissFishAPIError(f"Error obtaining Cat Kiss Fish token: {resp_json.get('msg')}", response_json=resp_json)
+    return resp_json["data"]["client_token"]
+
+# 🐟 Build the request headers for calls made with a client token
+def catkissfish_headers(access_token):
+    return {
+        "Content-Type": "application/json;charset=utf-8",
+        "access_token": access_token
+    }
+
+# 🐟 Fetch the full details of one order; the response validators are appended to
+# `validators` when a list is passed
+def fetch_catkissfish_order_details(order_id, access_token, timeout=30, validators=None):
+    response = requests.get(CATKISSFISH_ORDER_DETAIL_URL, headers=catkissfish_headers(access_token), params={"id": order_id}, timeout=timeout)
+    if response.status_code != 200:
+        raise CatKissFishAPIError(f"HTTP Error {response.status_code} while fetching Cat Kiss Fish order details.", response_text=response.text)
+    resp_json = decode_response(response, "catkissfish-order")
+    if resp_json.get("code") not in [200, 0]:
+        raise CatKissFishAPIError(f"Cat Kiss Fish API Error: {resp_json.get('message')}", response_json=resp_json)
+    record_validators(validators, response)
+    return resp_json["data"]
+
+# 🐟 Ask whether an order changed since it was cached; True only on 304 Not Modified
+def catkissfish_order_unchanged(order_id, access_token, validators, timeout=30):
+    if not can_revalidate(validators):
+        return False
+    headers = {**catkissfish_headers(access_token), **conditional_headers(validators[0])}
+    try:
+        response = requests.get(CATKISSFISH_ORDER_DETAIL_URL, headers=headers, params={"id": order_id}, timeout=timeout)
+    except requests.RequestException:
+        return False
+    return response.status_code == 304
+
+# 🐟 List recent order IDs through the optional list endpoint; empty when it is not configured
+def fetch_recent_catkissfish_order_ids(access_token, timeout=30):
+    if not CATKISSFISH_ORDER_LIST_URL:
+        return []
+    response = requests.get(CATKISSFISH_ORDER_LIST_URL, headers=catkissfish_headers(access_token), timeout=timeout)
+    if response.status_code != 200:
+        raise CatKissFishAPIError(f"HTTP Error {response.status_code} while listing Cat Kiss Fish orders.", response_text=response.text)
+    data = decode_response(response, "catkissfish-orders").get("data") or []
+    # Accept both a bare list and the usual paged {"list": [...]} / {"records": [...]} shapes
+    if isinstance(data, dict):
+        data = data.get("list") or data.get("records") or []
+    return [str(order["id"]) for order in data if isinstance(order, dict) and order.get("id")]
+
+# ==========================================
+# ✂️ Order Projection
+# ==========================================
+
+# ✂️ Keep only the order fields the comparator and order index use
+def project_catkissfish_order(order):
+    address = order.get("address") or {}
+    projected = {key: order[key] for key in ("id", "createTime", "createdTime", "orderTime") if key in order}
+    projected["address"] = {key: address[key] for key in ("userName", "detailAddress", "postalCode") if key in address}
+    projected["orderDesignHistoryList"] = [
+        {key: design[key] for key in ("productName", "sizeName", "quantity", "effectImageUrl") if key in design}
+        for design in order.get("orderDesignHistoryList", [])
+    ]
+    return projected
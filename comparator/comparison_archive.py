@@ -0,0 +1,132 @@
+# comparison_archive.py
+#
+# Audit trail of finished comparisons and their approvals, in a SQLite file. By default the file
+# lives under .cache/ next to the app, which on hosts with an ephemeral disk (such as the dynos the
+# Procfile targets) is wiped on every restart; point COMPARISON_ARCHIVE_PATH at persistent storage
+# wherever the history has to be kept.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# 📦 zstd-compressed msgpack when both are installed, zlib-compressed JSON otherwise
+try:
+    import msgpack
+    import zstandard
+except ImportError:
+    msgpack = None
+    zstandard = None
+
+# ==========================================
+# ⚙️ Archive Settings
+# ==========================================
+
+COMPARISON_ARCHIVE_PATH_CONFIGURED = "COMPARISON_ARCHIVE_PATH" in os.environ
+COMPARISON_ARCHIVE_PATH = os.getenv(
+    "COMPARISON_ARCHIVE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "comparison_archive.sqlite3")
+)
+ZSTD_LEVEL = 10  # Archives are written once and read many times, so favour ratio over speed
+
+# ==========================================
+# 🗜️ Payload Codecs
+# ==========================================
+
+def _encode_payload(payload):
+    if msgpack is not None:
+        return "zstd+msgpack", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(msgpack.packb(payload, use_bin_type=True))
+    return "zlib+json", zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 9)
+
+# Rows remember their codec, so archives written on one setup stay readable on the other
+def _decode_payload(codec, blob):
+    if codec == "zstd+msgpack":
+        if msgpack is None:
+            raise RuntimeError("This archive entry needs the 'msgpack' and 'zstandard' packages.")
+        return msgpack.unpackb(zstandard.ZstdDecompressor().decompress(blob), raw=False)
+    if codec == "zlib+json":
+        return json.loads(zlib.decompress(blob))
+    raise ValueError(f"Unknown archive codec '{codec}'")
+
+# ==========================================
+# 🗄️ Comparison Archive
+# ==========================================
+
+# 🗄️ Append-only archive of finished comparisons; every save is kept as an audit trail
+class ComparisonArchive:
+    def __init__(self, path=COMPARISON_ARCHIVE_PATH):
+        self.path = path
+        self.persistent = path != COMPARISON_ARCHIVE_PATH or COMPARISON_ARCHIVE_PATH_CONFIGURED  # Default .cache/ path may be ephemeral
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS comparisons (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    catkissfish_order_id TEXT NOT NULL,
+                    shopify_order_number TEXT NOT NULL,
+                    store_prefix TEXT NOT NULL,
+                    archived_at REAL NOT NULL,
+                    approved_at REAL,
+                    codec TEXT NOT NULL,
+                    payload BLOB NOT NULL
+                )"""
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS comparisons_by_pair ON comparisons (catkissfish_order_id, shopify_order_number, id)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS comparisons_by_shopify ON comparisons (shopify_order_number, id)"
+            )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    # 💾 Archive a finished comparison (projected payloads, image URLs and diff result)
+    def save(self, catkissfish_order_id, shopify_order_number, store_prefix, payload):
+        codec, blob = _encode_payload(payload)
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT INTO comparisons (catkissfish_order_id, shopify_order_number, store_prefix, archived_at, codec, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(catkissfish_order_id), str(shopify_order_number), store_prefix, time.time(), codec, blob)
+            )
+
+    # 📂 The latest archived comparison of a pair, or None
+    def load(self, catkissfish_order_id, shopify_order_number):
+        row = self._connection().execute(
+            "SELECT archived_at, approved_at, codec, payload FROM comparisons "
+            "WHERE catkissfish_order_id = ? AND shopify_order_number = ? ORDER BY id DESC LIMIT 1",
+            (str(catkissfish_order_id), str(shopify_order_number))
+        ).fetchone()
+        if row is None:
+            return None
+        archived_at, approved_at, codec, blob = row
+        return {"archived_at": archived_at, "approved_at": approved_at, "payload": _decode_payload(codec, blob)}
+
+    # ✅ Mark the latest archived comparison of a pair as approved. An approval is never overwritten,
+    # so the audit trail keeps its original time; returns whether this call approved it
+    def approve(self, catkissfish_order_id, shopify_order_number):
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "UPDATE comparisons SET approved_at = ? WHERE approved_at IS NULL AND id = ("
+                "SELECT id FROM comparisons WHERE catkissfish_order_id = ? AND shopify_order_number = ? ORDER BY id DESC LIMIT 1)",
+                (time.time(), str(catkissfish_order_id), str(shopify_order_number))
+            )
+            return cursor.rowcount == 1
+
+    # 📜 Audit trail of a pair: when each comparison was archived and approved, newest first
+    def history(self, catkissfish_order_id, shopify_order_number):
+        return self._connection().execute(
+            "SELECT archived_at, approved_at FROM comparisons "
+            "WHERE catkissfish_order_id = ? AND shopify_order_number = ? ORDER BY id DESC",
+            (str(catkissfish_order_id), str(shopify_order_number))
+        ).fetchall()
@@ -0,0 +1,314 @@
+# comparison_view.py
+#
+# Assembly of a comparison from a Cat Kiss Fish order and a Shopify order, and its rendering.
+# Assembled comparisons are plain dicts so they can be archived and rendered again later.
+
+import time
+
+import streamlit as st
+
+from comparator.lookups import LOOKUP_FAILED, get_shopify_variant_image
+from comparator.order_index import normalize_customer_name, normalize_postal_code
+
+# ==========================================
+# 🧩 Comparison Assembly and Rendering
+# ==========================================
+
+# 🧩 Build everything the comparison view renders from the two orders; design similarity is
+# scored separately (score_comparison) so the page can be drawn before the images are downloaded
+def assemble_comparison(catkissfish_order, shopify_order, store_prefix, profiler):
+    # 🐟 Cat Kiss Fish Order Details
+    # Extracting required fields from orderDesignHistoryList
+    order_design_history = catkissfish_order.designs
+    
+    # Reverse the order of products
+    order_design_history_reversed = order_design_history[::-1]
+    
+    # Initialize lists to store extracted data
+    cat_product_names = []
+    cat_size_names = []
+    cat_quantities = []
+    cat_effect_images = []
+    
+    for design in order_design_history_reversed:
+        product_name = design.product_name
+        size_name = design.size_name
+        quantity = design.quantity
+        urls = list(design.effect_image_urls)  # Already split, without the last image
+        
+        cat_product_names.append(product_name)
+        cat_size_names.append(size_name)
+        cat_quantities.append(quantity)
+        cat_effect_images.append(urls)
+    
+    # Aggregate the data for display
+    catkissfish_data = {
+        "Order ID": catkissfish_order.id,
+        "Product Names": cat_product_names if cat_product_names else ["N/A"],
+        "Size Names": cat_size_names if cat_size_names else ["N/A"],
+        "Quantities": cat_quantities if cat_quantities else ["N/A"],
+        "Customer Name": catkissfish_order.user_name,
+        "Detail Address": catkissfish_order.detail_address,
+        "Postal Code": catkissfish_order.postal_code,
+    }
+    
+    # 🛍️ Shopify Order Details
+    shopify_data = {
+        "Order Number": shopify_order.order_number,
+        "Product Names": [item.name for item in shopify_order.line_items],
+        "Size Names": [item.variant_title for item in shopify_order.line_items],
+        "Quantities": [str(item.quantity) for item in shopify_order.line_items],
+        "Customer Name": shopify_order.customer_name,
+        "Detail Address": shopify_order.address1,
+        "Postal Code": shopify_order.zip,
+        "Variant Images": []  # Placeholder for variant images
+    }
+    shopify_line_item_properties = [
+        [{"name": name, "value": value} for name, value in item.properties]
+        for item in shopify_order.line_items
+    ]
+    
+    # 🛍️ Fetch Shopify Variant Images
+    complete = True  # False once a lookup fails, so a half-loaded comparison is never archived
+    for item in shopify_order.line_items:
+        variant_id = item.variant_id
+        if variant_id:
+            with profiler.span(f"shopify variant image {variant_id}"):
+                image_url = get_shopify_variant_image(variant_id, store_prefix)
+            if image_url:
+                shopify_data["Variant Images"].append([image_url])  # List to maintain consistency
+            else:
+                shopify_data["Variant Images"].append([])
+                if image_url is LOOKUP_FAILED:  # None is a variant without any image, which is fine
+                    complete = False
+        else:
+            shopify_data["Variant Images"].append([])
+    
+    # 🗂️ Determine the number of products to align
+    max_products = max(len(catkissfish_data['Product Names']), len(shopify_data['Product Names']))
+    
+    # Extend lists to match the maximum number of products
+    while len(catkissfish_data['Product Names']) < max_products:
+        catkissfish_data['Product Names'].append("N/A")
+        catkissfish_data['Size Names'].append("N/A")
+        catkissfish_data['Quantities'].append("N/A")
+    while len(cat_effect_images) < max_products:
+        cat_effect_images.append([])
+    
+    while len(shopify_data['Product Names']) < max_products:
+        shopify_data['Product Names'].append("N/A")
+        shopify_data['Size Names'].append("N/A")
+        shopify_data['Quantities'].append("N/A")
+        shopify_data['Variant Images'].append([])
+        shopify_line_item_properties.append([])
+    
+    return {
+        "catkissfish_data": catkissfish_data,
+        "shopify_data": shopify_data,
+        "cat_effect_images": cat_effect_images,
+        "shopify_line_item_properties": shopify_line_item_properties,
+        "similarity_scores": [None] * max_products,
+        "differences": find_differences(catkissfish_data, shopify_data),
+        "complete": complete
+    }
+
+# 🖼️ Score how closely each product's effect images match its Shopify variant image
+def score_comparison(comparison, profiler):
+    from comparator.image_similarity import score_products  # Pillow is only loaded once images are compared
+    
+    with profiler.span("image similarity"):
+        comparison["similarity_scores"] = score_products(
+            list(zip(comparison["cat_effect_images"], comparison["shopify_data"]["Variant Images"]))
+        )
+
+# 🔎 List the fields where the two orders disagree
+def find_differences(catkissfish_data, shopify_data):
+    differences = []
+    if normalize_customer_name(catkissfish_data['Customer Name']) != normalize_customer_name(shopify_data['Customer Name']):
+        differences.append("Customer Name")
+    if str(catkissfish_data['Detail Address']).strip().casefold() != str(shopify_data['Detail Address']).strip().casefold():
+        differences.append("Detail Address")
+    if normalize_postal_code(catkissfish_data['Postal Code']) != normalize_postal_code(shopify_data['Postal Code']):
+        differences.append("Postal Code")
+    for idx, (cat_quantity, shop_quantity) in enumerate(zip(catkissfish_data['Quantities'], shopify_data['Quantities'])):
+        if str(cat_quantity) != str(shop_quantity):
+            differences.append(f"Quantity (Product {idx + 1})")
+    return differences
+
+# 🖼️ Render a comparison, either freshly assembled or loaded from the archive. Returns a function
+# that fills in the design similarity; with similarity_pending the page calls it once scored
+def render_comparison(comparison, similarity_pending=False):
+    catkissfish_data = comparison["catkissfish_data"]
+    shopify_data = comparison["shopify_data"]
+    cat_effect_images = comparison["cat_effect_images"]
+    shopify_line_item_properties = comparison["shopify_line_item_properties"]
+    similarity_scores = comparison["similarity_scores"]
+    max_products = len(catkissfish_data['Product Names'])
+    
+    if comparison["differences"]:
+        st.warning(f"🔎 **Differences:** {', '.join(comparison['differences'])}")
+    else:
+        st.info("🔎 No differences in customer name, address, postal code or quantities.")
+    
+    # Removed the heading "🏠 Shipping Address Comparison 🏠"
+    col_addr1, col_addr2 = st.columns(2)
+    
+    with col_addr1:
+        st.markdown("#### 🐟 **Cat Kiss Fish Shipping Address** 🐟")
+        st.write(f"**Customer Name:** {catkissfish_data['Customer Name']}")
+        st.write(f"**Detail Address:** {catkissfish_data['Detail Address']}")
+        st.write(f"**Postal Code:** {catkissfish_data['Postal Code']}")
+    
+    with col_addr2:
+        st.markdown("#### 🛍️ **Shopify Shipping Address** 🛍️")
+        st.write(f"**Customer Name:** {shopify_data['Customer Name']}")
+        st.write(f"**Detail Address:** {shopify_data['Detail Address']}")
+        st.write(f"**Postal Code:** {shopify_data['Postal Code']}")
+    
+    st.markdown("---")
+    
+    # ==========================================
+    # 📦 **Product Comparison**
+    # ==========================================
+    
+    # Removed the heading "📦 Product Comparison 📦"
+    st.markdown("### 📦 **Product Comparison** 📦")  # Retained for clarity
+    
+    # Show the least similar designs first so likely mismatches stand out; scores that arrive
+    # after the page is drawn go into the slots below instead
+    product_order = list(range(max_products))
+    if any(score is not None for score in similarity_scores):
+        product_order.sort(key=lambda i: -1 if similarity_scores[i] is None else similarity_scores[i])
+    similarity_summary_slot = st.empty()
+    if similarity_pending:
+        similarity_summary_slot.caption("🖼️ Comparing design images...")
+    similarity_slots = {}
+    
+    for idx in product_order:
+        st.markdown(f"#### 🛒 **Product {idx + 1} Comparison** 🛒")
+        similarity_slots[idx] = st.empty()
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown(f"##### 🐟 **Cat Kiss Fish - Product {idx + 1}** 🐟")
+            st.write(f"**Product Name:** {catkissfish_data['Product Names'][idx]}")
+            st.write(f"**Size Name:** {catkissfish_data['Size Names'][idx]}")
+            st.write(f"**Quantity:** {catkissfish_data['Quantities'][idx]}")
+            
+            # Display Effect Images in a Scrollable Square Box with height:700px; width:100%
+            if cat_effect_images[idx]:
+                st.markdown("**Effect Images:**")
+                # Create a scrollable container using HTML and CSS with specified size
+                effect_images_html = f"""
+                <div style='height:700px; width:100%; overflow-y: scroll; border:1px solid #ccc; padding:5px;'>
+                """
+                for url in cat_effect_images[idx]:
+                    effect_images_html += f"<img src='{url}' alt='Effect Image' style='width:100%; margin-bottom:10px;'>"
+                effect_images_html += "</div>"
+                st.markdown(effect_images_html, unsafe_allow_html=True)
+            else:
+                st.write("**Effect Images:** No effect images available.")
+        
+        with col2:
+            st.markdown(f"##### 🛍️ **Shopify - Product {idx + 1}** 🛍️")
+            st.write(f"**Product Name:** {shopify_data['Product Names'][idx]}")
+            
+            # Display Product Properties Above Size Name and Remove "Product Properties:" Text
+            line_item_properties = shopify_line_item_properties[idx]
+            if line_item_properties:
+                for prop in line_item_properties:
+                    key = prop.get("name", "N/A")
+                    value = prop.get("value", "N/A")
+                    st.write(f"- **{key}:** {value}")
+            else:
+                st.write("- **No Product Properties Available.**")
+            
+            st.write(f"**Size Name:** {shopify_data['Size Names'][idx]}")
+            st.write(f"**Quantity:** {shopify_data['Quantities'][idx]}")
+            
+            # Display Shopify Variant Image(s)
+            variant_images = shopify_data['Variant Images'][idx]
+            if variant_images:
+                st.markdown("**Product Variant Image:**")
+                for img_url in variant_images:
+                    st.image(img_url, use_column_width=True)
+            else:
+                st.write("**Product Variant Image:** No images available.")
+        
+        st.markdown("---")  # Separator between products
+    
+    # ==========================================
+    # 🐟 **Cat Kiss Fish Order Properties**
+    # ==========================================
+    
+    # Removed the entire Order Properties section as per request
+    
+    # ==========================================
+    # 🛍️ **Shopify Order Properties**
+    # ==========================================
+    
+    # Removed the entire Shopify Order Properties section as per request
+    
+    # ==========================================
+    # 📋 **Additional Order Information**
+    # ==========================================
+    
+    st.markdown("---")
+    st.markdown("### 📋 **Additional Order Information** 📋")
+    additional_info_cols = st.columns(2)
+    additional_info_cols[0].markdown(f"**Cat Kiss Fish Order ID:** {catkissfish_data.get('Order ID', 'N/A')}")
+    additional_info_cols[1].markdown(f"**Shopify Order Number:** {shopify_data.get('Order Number', 'N/A')}")
+    
+    # 🖼️ Fill the similarity summary and the per-product notes, least similar first
+    def show_similarity(scores):
+        if not any(score is not None for score in scores):
+            similarity_summary_slot.empty()
+            return
+        from comparator.image_similarity import SIMILARITY_WARNING_THRESHOLD
+        
+        similarity_summary_slot.markdown("**🖼️ Design Similarity:** " + " · ".join(
+            f"{'⚪' if scores[i] is None else '🔴' if scores[i] < SIMILARITY_WARNING_THRESHOLD else '🟢'} Product {i + 1}: "
+            f"{'n/a' if scores[i] is None else f'{scores[i]:.0%}'}"
+            for i in sorted(range(len(scores)), key=lambda i: -1 if scores[i] is None else scores[i])
+        ))
+        for idx, score in enumerate(scores):
+            if score is None:
+                continue
+            if score < SIMILARITY_WARNING_THRESHOLD:
+                similarity_slots[idx].warning(f"🖼️ Design similarity {score:.0%}: the effect images may not match the Shopify variant.")
+            else:
+                similarity_slots[idx].caption(f"🖼️ Design similarity {score:.0%}")
+    
+    if not similarity_pending:
+        show_similarity(similarity_scores)
+    return show_similarity
+
+# 🗄️ Approve / refetch controls and the archive history of a pair. Only an archived comparison
+# can be approved, and only once; one with failed lookups is not archived and can only be refetched
+def render_archive_controls(comparison_archive, cat_order, shop_order, archived=True, approved_at=None):
+    st.markdown("---")
+    st.markdown("### 🗄️ **Review** 🗄️")
+    review_cols = st.columns(2)
+    if not archived:
+        review_cols[0].warning("⚠️ Some lookups failed, so this comparison was not archived. Refetch to try again.")
+    elif approved_at:
+        review_cols[0].success(f"✅ Approved {format_timestamp(approved_at)}.")
+    elif review_cols[0].button("✅ Approve Comparison"):
+        if comparison_archive.approve(cat_order, shop_order):
+            st.success(f"✅ Comparison of {cat_order} and {shop_order} approved.")
+        else:
+            st.info(f"ℹ️ Comparison of {cat_order} and {shop_order} was already approved.")
+    review_cols[1].button(
+        "🔄 Refetch from Upstream",
+        on_click=lambda: st.session_state.update(refetch_pair=(cat_order, shop_order))
+    )
+    with st.expander("📜 Archive History"):
+        if not comparison_archive.persistent:
+            st.caption(f"⚠️ The archive is kept at {comparison_archive.path}. Set COMPARISON_ARCHIVE_PATH to persistent storage, or the history is lost whenever the host's disk is reset (e.g. on every dyno restart).")
+        for archived_at, approved_at in comparison_archive.history(cat_order, shop_order):
+            approval = f" — approved {format_timestamp(approved_at)}" if approved_at else ""
+            st.write(f"- Archived {format_timestamp(archived_at)}{approval}")
+
+# 🕒 Format an epoch timestamp for display
+def format_timestamp(timestamp):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
@@ -0,0 +1,68 @@
+# config.py
+#
+# Settings shared by the app, the cache warm-up, the webhook receiver and the batch client.
+# They are resolved once per process, on first import: Streamlit re-executes the page script
+# on every interaction but keeps imported modules, so reruns do not read them again.
+# Values come from the environment (a .env file in development); Streamlit Community Cloud
+# also exports root-level secrets as environment variables.
+
+import os
+
+from dotenv import load_dotenv
+
+# ==========================================
+# 🔒 Configuration: Load Environment Variables
+# ==========================================
+
+# Load environment variables from .env file
+load_dotenv()
+
+# 🐟 Cat Kiss Fish API Credentials
+CATKISSFISH_CLIENT_ID = os.getenv("CATKISSFISH_CLIENT_ID")
+CATKISSFISH_CLIENT_SECRET = os.getenv("CATKISSFISH_CLIENT_SECRET")
+
+# 🛍️ Shopify Stores Configuration (the webhook signing secret is shown under Settings → Notifications)
+SHOPIFY_STORES = {
+    'G': {
+        'url': os.getenv("SHOPIFY_STORE_1_URL"),
+        'access_token': os.getenv("SHOPIFY_STORE_1_ACCESS_TOKEN"),
+        'webhook_secret': os.getenv("SHOPIFY_STORE_1_WEBHOOK_SECRET")
+    },
+    'C': {
+        'url': os.getenv("SHOPIFY_STORE_2_URL"),
+        'access_token': os.getenv("SHOPIFY_STORE_2_ACCESS_TOKEN"),
+        'webhook_secret': os.getenv("SHOPIFY_STORE_2_WEBHOOK_SECRET")
+    },
+    'U': {
+        'url': os.getenv("SHOPIFY_STORE_3_URL"),
+        'access_token': os.getenv("SHOPIFY_STORE_3_ACCESS_TOKEN"),
+        'webhook_secret': os.getenv("SHOPIFY_STORE_3_WEBHOOK_SECRET")
+    }
+}
+
+# ==========================================
+# 🗄️ Shared Cache Backend
+# ==========================================
+
+# Set to share the cache and the Cat Kiss Fish token between app processes on several machines
+# (e.g. redis://localhost:6379/0); without it, processes on one machine share a SQLite file
+REDIS_URL = os.getenv("REDIS_URL")
+
+# ==========================================
+# 🗄️ Shared Cache Lifetimes
+# ==========================================
+
+CATKISSFISH_TOKEN_CACHE_TTL = 7000  # Tokens are valid for 7200 seconds
+# The in-process caches in lookups.py use the same lifetimes
+CATKISSFISH_ORDER_CACHE_TTL = 600
+SHOPIFY_ORDER_CACHE_TTL = 600
+SHOPIFY_VARIANT_IMAGE_CACHE_TTL = 3600
+
+# ==========================================
+# 🧠 In-Process Cache Budgets
+# ==========================================
+
+# Hard byte budgets keep a long day of batch use from growing the dyno's memory without bound
+CATKISSFISH_ORDER_CACHE_MAX_BYTES = 32 * 1024 * 1024
+SHOPIFY_ORDER_CACHE_MAX_BYTES = 32 * 1024 * 1024
+SHOPIFY_VARIANT_IMAGE_CACHE_MAX_BYTES = 8 * 1024 * 1024
@@ -0,0 +1,145 @@
+# image_similarity.py
+
+import io
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import requests
+from PIL import Image
+
+# ==========================================
+# ⚙️ Similarity Settings
+# ==========================================
+
+HASH_SIZE = 8  # 8x8 difference hash -> 64 bits
+HASH_BITS = HASH_SIZE * HASH_SIZE
+SIMILARITY_WARNING_THRESHOLD = 0.75  # Scores below this are flagged as a likely design mismatch
+IMAGE_DOWNLOAD_TIMEOUT = 20
+IMAGE_DOWNLOAD_WORKERS = 16
+# Hashing processes; each is a full interpreter, and os.cpu_count() reports the host's CPUs on
+# shared dynos rather than what their memory can hold
+IMAGE_HASH_WORKERS = int(os.getenv("IMAGE_HASH_WORKERS", "2"))
+IMAGE_HASH_CACHE_SIZE = 20000  # Hashes are small ints, so many URLs fit comfortably
+
+# ==========================================
+# 🧮 Perceptual Hashing (runs in worker processes)
+# ==========================================
+
+# 🧮 Compute a 64-bit difference hash (dHash) from raw image bytes
+def compute_image_hash(image_bytes):
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        # Let JPEG decoding downscale on the fly; the hash only needs a tiny thumbnail
+        image.draft("RGB", (HASH_SIZE * 8, HASH_SIZE * 8))
+        if image.mode in ("RGBA", "LA", "P"):
+            # Flatten transparent mockups onto white so the background does not dominate the hash
+            image = image.convert("RGBA")
+            background = Image.new("RGBA", image.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, image)
+        image = image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS)
+        pixels = image.tobytes()
+    bits = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+# ⚖️ Similarity between two hashes: 1.0 for identical, ~0.5 for unrelated images
+def hash_similarity(hash_a, hash_b):
+    return 1 - bin(hash_a ^ hash_b).count("1") / HASH_BITS
+
+# ==========================================
+# 🏊 Shared Pools and Hash Cache
+# ==========================================
+
+_pool_lock = threading.Lock()
+_process_pool = None
+_download_pool = None
+
+_hash_cache = OrderedDict()  # url -> hash, least recently used first
+_hash_cache_lock = threading.Lock()
+
+# 🏊 Lazily start the pools shared by every session in this process
+def _get_pools():
+    global _process_pool, _download_pool
+    with _pool_lock:
+        if _process_pool is None:
+            # "spawn" avoids forking the multi-threaded Streamlit server
+            _process_pool = ProcessPoolExecutor(
+                max_workers=IMAGE_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            _download_pool = ThreadPoolExecutor(max_workers=IMAGE_DOWNLOAD_WORKERS, thread_name_prefix="image-download")
+        return _process_pool, _download_pool
+
+def _cached_hash(url):
+    with _hash_cache_lock:
+        image_hash = _hash_cache.get(url)
+        if image_hash is not None:
+            _hash_cache.move_to_end(url)
+        return image_hash
+
+def _store_hash(url, image_hash):
+    with _hash_cache_lock:
+        _hash_cache[url] = image_hash
+        _hash_cache.move_to_end(url)
+        while len(_hash_cache) > IMAGE_HASH_CACHE_SIZE:
+            _hash_cache.popitem(last=False)
+
+def _download_image(url):
+    response = requests.get(url, timeout=IMAGE_DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+# ==========================================
+# 🖼️ Batch Hashing and Scoring
+# ==========================================
+
+# 🖼️ Hash every URL, downloading in threads and hashing in processes; failed images map to None
+def hash_images(urls):
+    hashes = {}
+    missing = []
+    for url in dict.fromkeys(urls):
+        image_hash = _cached_hash(url)
+        if image_hash is None:
+            missing.append(url)
+        else:
+            hashes[url] = image_hash
+    if not missing:
+        return hashes
+
+    process_pool, download_pool = _get_pools()
+    downloads = {download_pool.submit(_download_image, url): url for url in missing}
+    hash_jobs = {}
+    # Start hashing each image as soon as its download finishes
+    for future in as_completed(downloads):
+        url = downloads[future]
+        try:
+            hash_jobs[process_pool.submit(compute_image_hash, future.result())] = url
+        except Exception:
+            hashes[url] = None
+    for future in as_completed(hash_jobs):
+        url = hash_jobs[future]
+        try:
+            hashes[url] = future.result()
+            _store_hash(url, hashes[url])
+        except Exception:
+            hashes[url] = None
+    return hashes
+
+# 📊 Score (effect image URLs, variant image URLs) pairs; the best-matching image pair wins
+def score_products(product_images):
+    all_urls = [url for effect_urls, variant_urls in product_images for url in (*effect_urls, *variant_urls)]
+    hashes = hash_images(all_urls)
+    scores = []
+    for effect_urls, variant_urls in product_images:
+        effect_hashes = [hashes[url] for url in effect_urls if hashes.get(url) is not None]
+        variant_hashes = [hashes[url] for url in variant_urls if hashes.get(url) is not None]
+        if effect_hashes and variant_hashes:
+            scores.append(max(hash_similarity(a, b) for a in effect_hashes for b in variant_hashes))
+        else:
+            scores.append(None)  # Nothing to compare on one of the sides
+    return scores
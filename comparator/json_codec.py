@@ -0,0 +1,121 @@
+# json_codec.py
+#
+# Decoding of upstream responses. Bodies are parsed with orjson when it is installed, falling
+# back to the stdlib json module. Compression is negotiated by the HTTP clients themselves:
+# requests/urllib3 and aiohttp advertise gzip and deflate, plus br and zstd whenever brotli and
+# zstandard are installed to decode them, so no Accept-Encoding header is set here.
+#
+#   RESPONSE_RECORD_DIR=recorded_responses streamlit run order_comparison_app.py  # save raw bodies
+#   python -m comparator.json_codec recorded_responses/*.json                 # measure decoding
+
+import argparse
+import gzip
+import json
+import os
+import time
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib decoder gives the same result
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # Only used to report brotli sizes in the benchmark
+    brotli = None
+
+# ==========================================
+# ⚙️ Settings
+# ==========================================
+
+# When set, every decoded response body is also written to this directory for benchmarking
+RESPONSE_RECORD_DIR = os.getenv("RESPONSE_RECORD_DIR")
+
+# ==========================================
+# 🧬 Encoding and Decoding
+# ==========================================
+
+# 🧬 Parse a JSON document given as bytes or str
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# 🧬 Serialize to a compact JSON string
+def dumps(value):
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, separators=(",", ":"))
+
+# 🧬 Decode the JSON body of a requests response, recording it first when enabled
+def decode_response(response, label):
+    return decode_body(response.content, label)
+
+# 🧬 Decode a raw JSON response body, recording it first when enabled
+def decode_body(body, label):
+    if RESPONSE_RECORD_DIR:
+        record_response(RESPONSE_RECORD_DIR, label, body)
+    return loads(body)
+
+# 📼 Save a raw response body; the file name keeps the label so payload kinds can be told apart
+def record_response(record_dir, label, body):
+    os.makedirs(record_dir, exist_ok=True)
+    with open(os.path.join(record_dir, f"{time.time_ns()}-{label}.json"), "wb") as record_file:
+        record_file.write(body)
+
+# ==========================================
+# 📏 Benchmark on Recorded Payloads
+# ==========================================
+
+def _best_time(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+# 📏 Compare wire sizes and decode times of recorded bodies
+def benchmark(paths, repeat=20):
+    rows = []
+    for path in paths:
+        with open(path, "rb") as payload_file:
+            body = payload_file.read()
+        row = {
+            "payload": os.path.basename(path),
+            "raw_bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body)),
+            "brotli_bytes": len(brotli.compress(body)) if brotli is not None else None,
+            "stdlib_ms": _best_time(lambda: json.loads(body), repeat) * 1000,
+            "orjson_ms": _best_time(lambda: orjson.loads(body), repeat) * 1000 if orjson is not None else None
+        }
+        rows.append(row)
+    return rows
+
+def _format(value, spec):
+    return "n/a" if value is None else format(value, spec)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure JSON decoding and compression on recorded response bodies.")
+    parser.add_argument("paths", nargs="+", metavar="FILE", help="recorded response bodies (see RESPONSE_RECORD_DIR)")
+    parser.add_argument("--repeat", type=int, default=20, help="decode each payload this many times and keep the best")
+    args = parser.parse_args()
+
+    rows = benchmark(args.paths, args.repeat)
+    print(f"{'payload':<48} {'raw':>10} {'gzip':>10} {'brotli':>10} {'stdlib ms':>10} {'orjson ms':>10}")
+    for row in rows:
+        print(
+            f"{row['payload']:<48} {row['raw_bytes']:>10} {row['gzip_bytes']:>10} {_format(row['brotli_bytes'], '>10')} "
+            f"{row['stdlib_ms']:>10.3f} {_format(row['orjson_ms'], '>10.3f')}"
+        )
+    stdlib_total = sum(row["stdlib_ms"] for row in rows)
+    raw_total = sum(row["raw_bytes"] for row in rows)
+    print(f"\n{len(rows)} payloads, {raw_total} bytes raw, {sum(row['gzip_bytes'] for row in rows)} bytes gzip")
+    if orjson is not None:
+        orjson_total = sum(row["orjson_ms"] for row in rows)
+        print(f"stdlib {stdlib_total:.2f} ms, orjson {orjson_total:.2f} ms ({stdlib_total / max(orjson_total, 1e-9):.1f}x faster)")
+    else:
+        print(f"stdlib {stdlib_total:.2f} ms (install orjson to compare)")
+
+if __name__ == "__main__":
+    main()
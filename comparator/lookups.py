@@ -0,0 +1,200 @@
+# lookups.py
+#
+# Upstream lookups used by the page. Each one checks the in-process bounded cache, then the
+# shared cache, and reports failures in the page with st.error.
+
+import streamlit as st
+
+from comparator.bounded_cache import bounded_cache
+from comparator.catkissfish_api import (
+    CatKissFishAPIError,
+    catkissfish_order_unchanged,
+    fetch_catkissfish_access_token,
+    fetch_catkissfish_order_details,
+    project_catkissfish_order,
+)
+from comparator.config import (
+    CATKISSFISH_ORDER_CACHE_MAX_BYTES,
+    CATKISSFISH_ORDER_CACHE_TTL,
+    CATKISSFISH_TOKEN_CACHE_TTL,
+    SHOPIFY_ORDER_CACHE_MAX_BYTES,
+    SHOPIFY_ORDER_CACHE_TTL,
+    SHOPIFY_STORES,
+    SHOPIFY_VARIANT_IMAGE_CACHE_MAX_BYTES,
+    SHOPIFY_VARIANT_IMAGE_CACHE_TTL,
+)
+from comparator.order_cache import (
+    CATKISSFISH_TOKEN_CACHE_KEY,
+    MISSING,
+    catkissfish_order_cache_key,
+    get_or_create_shared,
+    get_shared_cache,
+    shopify_order_cache_key,
+    shopify_variant_image_cache_key,
+)
+from comparator.order_index import OrderIndex
+from comparator.order_records import CatKissFishOrderRecord, ShopifyOrderRecord
+from comparator.shopify_api import (
+    ShopifyAPIError,
+    fetch_shopify_orders,
+    fetch_shopify_variant_image_url,
+    filter_shipping_line_items,
+    project_shopify_order,
+    shopify_resources_unchanged,
+)
+
+# ==========================================
+# 🚀 Functions to Interact with APIs
+# ==========================================
+
+# 🚫 Returned by get_shopify_variant_image when the lookup failed, as opposed to None for a variant
+# and product without any image. Falsy, so the bounded cache does not keep it and it is retried
+class LookupFailed:
+    def __bool__(self):
+        return False
+
+LOOKUP_FAILED = LookupFailed()
+
+# 🐟 Function to get access token from Cat Kiss Fish
+def get_catkissfish_access_token(client_id, client_secret):
+    # The token lives in the shared cache (~2 hours) so the warm-up and every process reuse it;
+    # an in-process cache on top could outlive a token obtained elsewhere. When it expires, one
+    # process refreshes it while the others wait for the new one
+    try:
+        return get_or_create_shared(
+            CATKISSFISH_TOKEN_CACHE_KEY,
+            CATKISSFISH_TOKEN_CACHE_TTL,
+            lambda: fetch_catkissfish_access_token(client_id, client_secret)
+        )
+    except CatKissFishAPIError as e:
+        st.error(str(e))
+        show_catkissfish_error_response(e)
+        return None
+    except Exception as e:
+        st.error(f"Exception occurred while obtaining Cat Kiss Fish token: {e}")
+        return None
+
+# 🐟 Function to get order details from Cat Kiss Fish
+@bounded_cache("Cat Kiss Fish orders", max_bytes=CATKISSFISH_ORDER_CACHE_MAX_BYTES, ttl=CATKISSFISH_ORDER_CACHE_TTL)  # Auto-matching and comparison share the lookup
+def get_catkissfish_order_details(order_id, access_token):
+    shared_cache = get_shared_cache()
+    cache_key = catkissfish_order_cache_key(order_id)
+    cached_order = shared_cache.get(cache_key)
+    if cached_order is not MISSING:
+        return CatKissFishOrderRecord.from_projection(cached_order)
+    
+    # An expired entry that the upstream confirms unchanged only needs a fresh TTL
+    stale_entry = shared_cache.get_stale(cache_key)
+    if stale_entry is not MISSING and catkissfish_order_unchanged(order_id, access_token, stale_entry[1]):
+        shared_cache.touch(cache_key, CATKISSFISH_ORDER_CACHE_TTL)
+        return CatKissFishOrderRecord.from_projection(stale_entry[0])
+    
+    try:
+        validators = []
+        catkissfish_order = project_catkissfish_order(fetch_catkissfish_order_details(order_id, access_token, validators=validators))
+        shared_cache.set(cache_key, catkissfish_order, CATKISSFISH_ORDER_CACHE_TTL, validators)
+        return CatKissFishOrderRecord.from_projection(catkissfish_order)
+    except CatKissFishAPIError as e:
+        st.error(str(e))
+        show_catkissfish_error_response(e)
+        return None
+    except Exception as e:
+        st.error(f"Exception occurred while fetching Cat Kiss Fish order details: {e}")
+        return None
+
+# 🐟 Display the raw Cat Kiss Fish response behind an error for debugging
+def show_catkissfish_error_response(error):
+    if error.response_json is not None:
+        st.json(error.response_json)  # Display full response for debugging
+    elif error.response_text is not None:
+        st.text(error.response_text)  # Display response text for debugging
+
+# 🛍️ Function to get Shopify order details based on order name
+@bounded_cache("Shopify orders", max_bytes=SHOPIFY_ORDER_CACHE_MAX_BYTES, ttl=SHOPIFY_ORDER_CACHE_TTL)
+def get_shopify_order_details(order_number, store_prefix):
+    store = SHOPIFY_STORES.get(store_prefix.upper())
+    if not store:
+        st.error(f"No Shopify store configuration found for prefix '{store_prefix}'.")
+        return []
+    
+    # Orders pushed by the webhook receiver (or fetched by another session) are already projected
+    shared_cache = get_shared_cache()
+    cache_key = shopify_order_cache_key(store_prefix, order_number)
+    cached_orders = shared_cache.get(cache_key)
+    if cached_orders is not MISSING:
+        return [ShopifyOrderRecord.from_projection(order) for order in cached_orders]
+    
+    stale_entry = shared_cache.get_stale(cache_key)
+    if stale_entry is not MISSING and shopify_resources_unchanged(store, stale_entry[1]):
+        shared_cache.touch(cache_key, SHOPIFY_ORDER_CACHE_TTL)
+        return [ShopifyOrderRecord.from_projection(order) for order in stale_entry[0]]
+    
+    try:
+        validators = []
+        orders = fetch_shopify_orders(store, order_number, validators)
+        if orders:
+            # Filter out products containing "Versand" or "shipping" in the name
+            filtered_orders = filter_shipping_line_items(orders)
+            if filtered_orders:
+                projected_orders = [project_shopify_order(order) for order in filtered_orders]
+                shared_cache.set(cache_key, projected_orders, SHOPIFY_ORDER_CACHE_TTL, validators)
+                return [ShopifyOrderRecord.from_projection(order) for order in projected_orders]  # Return all filtered orders (assuming unique order numbers)
+            else:
+                st.error(f"All products in Shopify order {order_number} are excluded based on filtering criteria.")
+                return []
+        else:
+            st.error(f"No Shopify order found with Order Number: {order_number}")
+            return []
+    except ShopifyAPIError as e:
+        st.error(str(e))
+        st.text(e.response_text)  # Display response text for debugging
+        return []
+    except Exception as e:
+        st.error(f"Exception occurred while fetching Shopify order details: {e}")
+        return []
+
+# 🛍️ Function to get Shopify variant image given a variant ID and store prefix
+@bounded_cache("Shopify variant images", max_bytes=SHOPIFY_VARIANT_IMAGE_CACHE_MAX_BYTES, ttl=SHOPIFY_VARIANT_IMAGE_CACHE_TTL)
+def get_shopify_variant_image(variant_id, store_prefix):
+    store = SHOPIFY_STORES.get(store_prefix.upper())
+    if not store:
+        st.error(f"No Shopify store configuration found for prefix '{store_prefix}'.")
+        return LOOKUP_FAILED
+    
+    # Variant images pre-resolved by the webhook receiver are shared through the cache
+    shared_cache = get_shared_cache()
+    cache_key = shopify_variant_image_cache_key(store_prefix, variant_id)
+    cached_image_url = shared_cache.get(cache_key)
+    if cached_image_url is not MISSING:
+        return cached_image_url
+    
+    stale_entry = shared_cache.get_stale(cache_key)
+    if stale_entry is not MISSING and shopify_resources_unchanged(store, stale_entry[1]):
+        shared_cache.touch(cache_key, SHOPIFY_VARIANT_IMAGE_CACHE_TTL)
+        return stale_entry[0]
+    
+    try:
+        # Falls back to the product's default image if the variant has no specific image
+        validators = []
+        image_url = fetch_shopify_variant_image_url(store, variant_id, validators)
+        shared_cache.set(cache_key, image_url, SHOPIFY_VARIANT_IMAGE_CACHE_TTL, validators)
+        return image_url
+    except ShopifyAPIError as e:
+        st.error(str(e))
+        st.text(e.response_text)  # Display response text for debugging
+        return LOOKUP_FAILED
+    except Exception as e:
+        st.error(f"Exception occurred while fetching Shopify variant {variant_id} details: {e}")
+        return LOOKUP_FAILED
+
+# 🗂️ Shared index of recent Shopify orders used to auto-match Cat Kiss Fish orders
+@st.cache_resource  # One index per process, refreshed incrementally
+def get_order_index():
+    return OrderIndex()
+
+# 🗄️ Archive of finished comparisons, shared by every session in this process
+@st.cache_resource
+def get_comparison_archive():
+    from comparator.comparison_archive import ComparisonArchive  # zstandard is only loaded once a pair is opened
+    
+    return ComparisonArchive()
@@ -0,0 +1,212 @@
+# order_cache.py
+#
+# The shared cache behind the in-process caches: projected orders, variant image URLs, the
+# Cat Kiss Fish token and the warm-up progress. Two backends offer the same methods (get, set,
+# get_stale, touch, delete, acquire_lock, release_lock):
+#   SharedCache - a SQLite file, shared by the processes of one machine (default)
+#   RedisCache  - a Redis-protocol server, shared by processes on any machine (REDIS_URL, see redis_cache.py)
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from comparator.config import REDIS_URL
+from comparator.json_codec import dumps, loads
+
+# ==========================================
+# ⚙️ Shared Cache Settings
+# ==========================================
+
+# All processes on this machine (app, webhook receiver) share one SQLite file
+ORDER_CACHE_PATH = os.getenv("ORDER_CACHE_PATH", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "order_cache.sqlite3"))
+ORDER_CACHE_PURGE_INTERVAL = 300  # Seconds between sweeps of expired rows
+# Expired rows with validators are kept this long so they can be revalidated instead of refetched
+ORDER_CACHE_STALE_RETENTION = 7 * 24 * 3600
+
+MISSING = object()  # Returned by SharedCache.get on a miss, since None is a valid cached value
+
+SHARED_LOCK_TTL = 30  # Seconds a cross-process lock is held at most, should its holder die
+SHARED_LOCK_WAIT = 10  # Seconds to wait for another process's result before doing the work anyway
+SHARED_LOCK_POLL_INTERVAL = 0.1
+
+# ==========================================
+# 🔑 Cache Keys
+# ==========================================
+
+CATKISSFISH_TOKEN_CACHE_KEY = "catkissfish:token"
+WARMUP_PROGRESS_CACHE_KEY = "warmup:progress"
+
+# 🔑 Name of the lock taken while the value of a cache key is being created
+def lock_name(cache_key):
+    return f"lock:{cache_key}"
+
+# 🔑 Key of a projected Cat Kiss Fish order
+def catkissfish_order_cache_key(order_id):
+    return f"catkissfish:order:{order_id}"
+
+# 🔑 Key of a projected Shopify order list, e.g. "shopify:order:G:G61226"
+def shopify_order_cache_key(store_prefix, order_number):
+    return f"shopify:order:{store_prefix.upper()}:{str(order_number).lstrip('#').upper()}"
+
+# 🔑 Key of a resolved Shopify variant image URL
+def shopify_variant_image_cache_key(store_prefix, variant_id):
+    return f"shopify:variant_image:{store_prefix.upper()}:{variant_id}"
+
+# ==========================================
+# 🗄️ SQLite-Backed Shared Cache
+# ==========================================
+
+# 🗄️ JSON key/value store with per-entry TTL that several processes can read and write. Entries
+# may carry the validators of the responses they were built from (see revalidation.py)
+class SharedCache:
+    def __init__(self, path=ORDER_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._last_purge = 0.0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, validators TEXT)"
+            )
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(cache)")]
+            if "validators" not in columns:  # Cache files created before revalidation
+                connection.execute("ALTER TABLE cache ADD COLUMN validators TEXT")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS locks (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    # 🔌 One connection per thread; WAL lets readers proceed while another process writes
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            return MISSING
+        return loads(row[0])
+
+    def set(self, key, value, ttl, validators=None):
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, validators) VALUES (?, ?, ?, ?)",
+                (key, dumps(value), time.time() + ttl, dumps(validators) if validators else None)
+            )
+        self._purge_expired()
+
+    # 🕰️ An expired entry that can still be revalidated, as (value, validators); MISSING otherwise
+    def get_stale(self, key):
+        row = self._connection().execute(
+            "SELECT value, validators FROM cache WHERE key = ? AND validators IS NOT NULL", (key,)
+        ).fetchone()
+        if row is None:
+            return MISSING
+        return loads(row[0]), loads(row[1])
+
+    # 🕰️ Give a revalidated entry a fresh TTL
+    def touch(self, key, ttl):
+        with self._connection() as connection:
+            connection.execute("UPDATE cache SET expires_at = ? WHERE key = ?", (time.time() + ttl, key))
+
+    def delete(self, key):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    # 🔒 Take a cross-process lock without waiting; returns the owner token, or None when it is held
+    def acquire_lock(self, name, ttl=SHARED_LOCK_TTL):
+        owner = uuid.uuid4().hex
+        with self._connection() as connection:
+            connection.execute("DELETE FROM locks WHERE name = ? AND expires_at <= ?", (name, time.time()))
+            inserted = connection.execute(
+                "INSERT OR IGNORE INTO locks (name, owner, expires_at) VALUES (?, ?, ?)", (name, owner, time.time() + ttl)
+            ).rowcount
+        return owner if inserted else None
+
+    # 🔒 Release a lock, unless it expired and another process has taken it since
+    def release_lock(self, name, owner):
+        with self._connection() as connection:
+            connection.execute("DELETE FROM locks WHERE name = ? AND owner = ?", (name, owner))
+
+    def _purge_expired(self):
+        if time.monotonic() - self._last_purge < ORDER_CACHE_PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        with self._connection() as connection:
+            connection.execute(
+                "DELETE FROM cache WHERE expires_at <= ? AND (validators IS NULL OR expires_at <= ?)",
+                (time.time(), time.time() - ORDER_CACHE_STALE_RETENTION)
+            )
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+# 🗄️ The process-wide shared cache: Redis when REDIS_URL is set, the SQLite file otherwise
+def get_shared_cache():
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            if REDIS_URL:
+                from comparator.redis_cache import RedisCache  # redis is only needed when configured
+
+                _shared_cache = RedisCache(REDIS_URL)
+            else:
+                _shared_cache = SharedCache()
+        return _shared_cache
+
+# ==========================================
+# 🔒 Single-Flight Creation Across Processes
+# ==========================================
+
+# 🔒 The waiting half of single-flight creation, without the waiting itself, so blocking and
+# asyncio callers share it: call poll() every SHARED_LOCK_POLL_INTERVAL until it returns True.
+# Then either `value` holds what another process created, or this process creates the value
+# (holding the lock, or without it once SHARED_LOCK_WAIT has run out) and stores it with store()
+class SharedClaim:
+    def __init__(self, shared_cache, cache_key):
+        self.shared_cache = shared_cache
+        self.cache_key = cache_key
+        self.value = MISSING
+        self.owner = None
+        self._deadline = time.monotonic() + SHARED_LOCK_WAIT
+
+    def poll(self):
+        self.value = self.shared_cache.get(self.cache_key)
+        if self.value is not MISSING:
+            return True
+        self.owner = self.shared_cache.acquire_lock(lock_name(self.cache_key))
+        if self.owner is not None:
+            self.value = self.shared_cache.get(self.cache_key)  # Created while the lock was being taken
+        return self.owner is not None or time.monotonic() >= self._deadline
+
+    def store(self, value, ttl):
+        self.shared_cache.set(self.cache_key, value, ttl)
+        self.value = value
+
+    def release(self):
+        if self.owner is not None:
+            self.shared_cache.release_lock(lock_name(self.cache_key), self.owner)
+            self.owner = None
+
+# 🔒 Cached value of `cache_key`, created by at most one process at a time: the process that
+# takes the lock calls create() and stores the result, the others wait for it to appear. After
+# SHARED_LOCK_WAIT without a result, a waiting process creates the value itself
+def get_or_create_shared(cache_key, ttl, create):
+    claim = SharedClaim(get_shared_cache(), cache_key)
+    while not claim.poll():
+        time.sleep(SHARED_LOCK_POLL_INTERVAL)
+    try:
+        if claim.value is MISSING:
+            claim.store(create(), ttl)
+        return claim.value
+    finally:
+        claim.release()
@@ -0,0 +1,192 @@
+# order_index.py
+
+import re
+import threading
+import time
+import unicodedata
+from datetime import date, datetime, timedelta, timezone
+
+from comparator.shopify_api import fetch_recent_shopify_orders
+
+# ==========================================
+# ⚙️ Index Settings
+# ==========================================
+
+ORDER_INDEX_LOOKBACK_DAYS = 14  # How far back the first build reaches
+ORDER_INDEX_REFRESH_INTERVAL = 60  # Minimum seconds between incremental refreshes
+ORDER_INDEX_MATCH_WINDOW_DAYS = 3  # Cat Kiss Fish orders are placed up to this many days after the Shopify order
+
+# ==========================================
+# 🧹 Normalization Helpers
+# ==========================================
+
+# 👤 Normalize a customer name so "Müller, Hans", "hans mueller" and "Hans Muller" land on the
+# same key: accents are stripped first, then the umlaut spellings ae/oe/ue fold onto a/o/u
+def normalize_customer_name(name):
+    if not name:
+        return ""
+    name = name.casefold().replace("ß", "ss")
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    name = name.replace("ae", "a").replace("oe", "o").replace("ue", "u")
+    tokens = re.findall(r"[a-z0-9]+", name)
+    # Sort the tokens so first/last name order does not matter
+    return " ".join(sorted(tokens))
+
+# 📮 Normalize a postal code by dropping spaces, dashes and case
+def normalize_postal_code(postal_code):
+    if not postal_code:
+        return ""
+    return re.sub(r"[^0-9A-Z]", "", str(postal_code).upper())
+
+# 📅 Parse the calendar date of a Shopify order (in the store's own timezone)
+def shopify_order_date(order):
+    created_at = order.get("created_at") or ""
+    try:
+        return date.fromisoformat(created_at[:10])
+    except ValueError:
+        return None
+
+# 📅 Parse the calendar date of a Cat Kiss Fish order
+def catkissfish_order_date(order):
+    for field in ("createTime", "createdTime", "orderTime"):
+        value = order.get(field)
+        if isinstance(value, (int, float)) and value > 0:
+            # Millisecond epoch timestamps
+            return datetime.fromtimestamp(value / 1000, tz=timezone.utc).date()
+        if isinstance(value, str) and len(value) >= 10:
+            try:
+                return date.fromisoformat(value[:10])
+            except ValueError:
+                pass
+    # Order IDs start with the order date, e.g. 2024091112121444123628
+    order_id = str(order.get("id") or order.get("orderNo") or "")
+    try:
+        return datetime.strptime(order_id[:8], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+# 👤 All the names a Shopify order may be known by (shipping recipient and customer)
+def shopify_order_names(order):
+    shipping_address = order.get("shipping_address") or {}
+    customer = order.get("customer") or {}
+    names = {
+        shipping_address.get("name") or f"{shipping_address.get('first_name') or ''} {shipping_address.get('last_name') or ''}",
+        f"{customer.get('first_name') or ''} {customer.get('last_name') or ''}"
+    }
+    return {normalized for normalized in map(normalize_customer_name, names) if normalized}
+
+# ==========================================
+# 🗂️ Shopify Order Lookup Index
+# ==========================================
+
+# 🗂️ In-memory index of recent Shopify orders keyed on (name, postal code, order date)
+class OrderIndex:
+    def __init__(self, lookback_days=ORDER_INDEX_LOOKBACK_DAYS, refresh_interval=ORDER_INDEX_REFRESH_INTERVAL):
+        self.lookback_days = lookback_days
+        self.refresh_interval = refresh_interval
+        self._by_key = {}  # (name, postal code, date) -> {(store_prefix, order_name)}
+        self._keys_by_order = {}  # (store_prefix, order_id) -> (keys, order_name)
+        self._synced_until = {}  # store_prefix -> updated_at watermark of the last refresh
+        self._last_refresh = 0.0
+        self._built = False  # True once a refresh has reached every store
+        self.generation = 0  # Bumped whenever the indexed orders change, so matches can be reused until then
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys_by_order)
+
+    # ➕ Insert or replace a single Shopify order
+    def add_order(self, store_prefix, order):
+        order_id = order.get("id")
+        order_name = (order.get("name") or "").lstrip("#")
+        order_date = shopify_order_date(order)
+        postal_code = normalize_postal_code((order.get("shipping_address") or {}).get("zip"))
+        with self._lock:
+            previous_entry = self._keys_by_order.get((store_prefix, order_id))
+            self._remove_order(store_prefix, order_id)
+            keys = []
+            if not order.get("cancelled_at") and order_name and order_date and postal_code:
+                keys = [(name, postal_code, order_date) for name in shopify_order_names(order)]
+            if keys:
+                for key in keys:
+                    self._by_key.setdefault(key, set()).add((store_prefix, order_name))
+                self._keys_by_order[(store_prefix, order_id)] = (keys, order_name)
+            if self._keys_by_order.get((store_prefix, order_id)) != previous_entry:
+                self.generation += 1
+
+    def _remove_order(self, store_prefix, order_id):
+        keys, order_name = self._keys_by_order.pop((store_prefix, order_id), ((), None))
+        for key in keys:
+            candidates = self._by_key.get(key)
+            if candidates is not None:
+                candidates.discard((store_prefix, order_name))
+                if not candidates:
+                    del self._by_key[key]
+
+    # 🔄 Pull orders updated since the last refresh from every configured store
+    def refresh(self, stores, force=False):
+        recently_refreshed = not force and time.monotonic() - self._last_refresh < self.refresh_interval
+        if recently_refreshed and (self._built or not self._refresh_lock.locked()):
+            return {}
+        # Another session is already refreshing; its results are shared. Before the first build
+        # has finished there is nothing to share yet, so wait for it instead of matching against
+        # an empty index
+        if not self._refresh_lock.acquire(blocking=not self._built):
+            return {}
+        try:
+            if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+                return {}  # Refreshed by the session this one waited for
+            self._last_refresh = time.monotonic()
+            errors = {}
+            now = datetime.now(timezone.utc)
+            for store_prefix, store in stores.items():
+                if not store.get('url') or not store.get('access_token'):
+                    continue
+                since = self._synced_until.get(store_prefix, now - timedelta(days=self.lookback_days))
+                try:
+                    orders = fetch_recent_shopify_orders(store, since.isoformat(timespec="seconds"))
+                except Exception as e:
+                    errors[store_prefix] = e
+                    continue
+                for order in orders:
+                    self.add_order(store_prefix, order)
+                    try:
+                        since = max(since, datetime.fromisoformat(order.get("updated_at")))
+                    except (TypeError, ValueError):
+                        pass
+                self._synced_until[store_prefix] = since
+            self._prune(now.date() - timedelta(days=self.lookback_days))
+            self._built = self._built or not errors
+            return errors
+        finally:
+            self._refresh_lock.release()
+
+    # 🧹 Drop orders that fell out of the lookback window
+    def _prune(self, oldest_date):
+        with self._lock:
+            stale = [
+                order_key for order_key, (keys, _) in self._keys_by_order.items()
+                if keys[0][2] < oldest_date
+            ]
+            for store_prefix, order_id in stale:
+                self._remove_order(store_prefix, order_id)
+            if stale:
+                self.generation += 1
+
+    # 🔍 Find Shopify order candidates for a Cat Kiss Fish customer, newest first
+    def lookup(self, customer_name, postal_code, order_date, window_days=ORDER_INDEX_MATCH_WINDOW_DAYS):
+        name = normalize_customer_name(customer_name)
+        postal_code = normalize_postal_code(postal_code)
+        if not name or not postal_code or not order_date:
+            return []
+        candidates = []
+        # The Shopify order is usually placed first; allow one day ahead for timezone differences
+        with self._lock:
+            for offset in range(-1, window_days + 1):
+                for candidate in sorted(self._by_key.get((name, postal_code, order_date - timedelta(days=offset)), ())):
+                    if candidate not in candidates:
+                        candidates.append(candidate)
+        return candidates
+
@@ -0,0 +1,146 @@
+# order_records.py
+#
+# Compact, slotted records holding only the order fields the comparator renders. They are
+# what the in-process caches keep; the shared cache and the archive store their projections.
+
+from comparator.order_index import catkissfish_order_date
+
+# ==========================================
+# 🛍️ Shopify Records
+# ==========================================
+
+# 🛍️ One Shopify line item; properties are (name, value) pairs
+class ShopifyLineItemRecord:
+    __slots__ = ("name", "variant_title", "quantity", "variant_id", "properties")
+
+    def __init__(self, name, variant_title, quantity, variant_id, properties):
+        self.name = name
+        self.variant_title = variant_title
+        self.quantity = quantity
+        self.variant_id = variant_id
+        self.properties = properties
+
+    @classmethod
+    def from_projection(cls, item):
+        return cls(
+            item.get("name", "N/A"),
+            item.get("variant_title", "N/A"),
+            item.get("quantity", "N/A"),
+            item.get("variant_id"),
+            tuple((prop.get("name", "N/A"), prop.get("value", "N/A")) for prop in item.get("properties") or ())
+        )
+
+    def to_projection(self):
+        return {
+            "name": self.name,
+            "variant_title": self.variant_title,
+            "quantity": self.quantity,
+            "variant_id": self.variant_id,
+            "properties": [{"name": name, "value": value} for name, value in self.properties]
+        }
+
+# 🛍️ A Shopify order reduced to what the comparison view shows
+class ShopifyOrderRecord:
+    __slots__ = ("order_number", "first_name", "last_name", "address1", "zip", "line_items")
+
+    def __init__(self, order_number, first_name, last_name, address1, zip, line_items):
+        self.order_number = order_number
+        self.first_name = first_name
+        self.last_name = last_name
+        self.address1 = address1
+        self.zip = zip
+        self.line_items = line_items
+
+    @property
+    def customer_name(self):
+        return f"{self.first_name} {self.last_name}".strip()
+
+    @classmethod
+    def from_projection(cls, order):
+        customer = order.get("customer") or {}
+        shipping_address = order.get("shipping_address") or {}
+        return cls(
+            order.get("order_number", "N/A"),
+            customer.get("first_name") or "",
+            customer.get("last_name") or "",
+            shipping_address.get("address1", "N/A"),
+            shipping_address.get("zip", "N/A"),
+            tuple(ShopifyLineItemRecord.from_projection(item) for item in order.get("line_items", []))
+        )
+
+    def to_projection(self):
+        return {
+            "order_number": self.order_number,
+            "customer": {"first_name": self.first_name, "last_name": self.last_name},
+            "shipping_address": {"address1": self.address1, "zip": self.zip},
+            "line_items": [item.to_projection() for item in self.line_items]
+        }
+
+# ==========================================
+# 🐟 Cat Kiss Fish Records
+# ==========================================
+
+# 🐟 Split a comma-joined effectImageUrl; the last image is not an effect image and is dropped
+def split_effect_image_urls(effect_image_url):
+    urls = [url.strip() for url in (effect_image_url or "").split(",") if url.strip()]
+    return tuple(urls[:-1])
+
+# 🐟 One entry of orderDesignHistoryList; the effect image URLs are split once, when the
+# record is built, and cached with the order
+class CatKissFishDesignRecord:
+    __slots__ = ("product_name", "size_name", "quantity", "effect_image_url", "effect_image_urls")
+
+    def __init__(self, product_name, size_name, quantity, effect_image_url):
+        self.product_name = product_name
+        self.size_name = size_name
+        self.quantity = quantity
+        self.effect_image_url = effect_image_url
+        self.effect_image_urls = split_effect_image_urls(effect_image_url)
+
+    @classmethod
+    def from_projection(cls, design):
+        return cls(
+            design.get("productName", "N/A"),
+            design.get("sizeName", "N/A"),
+            design.get("quantity", "N/A"),
+            design.get("effectImageUrl", "")
+        )
+
+    def to_projection(self):
+        return {
+            "productName": self.product_name,
+            "sizeName": self.size_name,
+            "quantity": self.quantity,
+            "effectImageUrl": self.effect_image_url
+        }
+
+# 🐟 A Cat Kiss Fish order reduced to what the comparison view and auto-matching use
+class CatKissFishOrderRecord:
+    __slots__ = ("id", "order_date", "user_name", "detail_address", "postal_code", "designs")
+
+    def __init__(self, id, order_date, user_name, detail_address, postal_code, designs):
+        self.id = id
+        self.order_date = order_date
+        self.user_name = user_name
+        self.detail_address = detail_address
+        self.postal_code = postal_code
+        self.designs = designs
+
+    @classmethod
+    def from_projection(cls, order):
+        address = order.get("address") or {}
+        return cls(
+            order.get("id", "N/A"),
+            catkissfish_order_date(order),
+            address.get("userName", "N/A"),
+            address.get("detailAddress", "N/A"),
+            address.get("postalCode", "N/A"),
+            tuple(CatKissFishDesignRecord.from_projection(design) for design in order.get("orderDesignHistoryList", []))
+        )
+
+    def to_projection(self):
+        return {
+            "id": self.id,
+            "address": {"userName": self.user_name, "detailAddress": self.detail_address, "postalCode": self.postal_code},
+            "orderDesignHistoryList": [design.to_projection() for design in self.designs]
+        }
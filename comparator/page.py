@@ -0,0 +1,386 @@
+# page.py
+#
+# The Streamlit page. The entry scripts only call main(), so everything below is imported
+# once per process and a rerun costs no more than running main() again.
+
+import time
+
+import streamlit as st
+
+from comparator.batch_progress import BatchProgress
+from comparator.bounded_cache import all_cache_stats
+from comparator.cache_warmup import WARMUP_PROGRESS_STALE_AFTER
+from comparator.comparison_view import assemble_comparison, format_timestamp, render_archive_controls, render_comparison, score_comparison
+from comparator.config import CATKISSFISH_CLIENT_ID, CATKISSFISH_CLIENT_SECRET, SHOPIFY_STORES
+from comparator.lookups import (
+    get_catkissfish_access_token,
+    get_catkissfish_order_details,
+    get_comparison_archive,
+    get_order_index,
+    get_shopify_order_details,
+)
+from comparator.order_cache import MISSING, WARMUP_PROGRESS_CACHE_KEY, get_shared_cache
+from comparator.run_profiler import RunProfiler, profiling_requested
+
+# ==========================================
+# 🎨 Streamlit App Layout and Logic
+# ==========================================
+
+# 🧭 Input Mode: explicit pairs, or Cat Kiss Fish order numbers matched automatically
+INPUT_MODE_PAIRS = "Order Pairs"
+INPUT_MODE_AUTO_MATCH = "Cat Kiss Fish Only (Auto-Match)"
+
+BATCH_REFRESH_SECONDS = 1.0  # How often the batch status table redraws while pairs are loading
+
+# 🐟 App Title
+def render_page_header():
+    st.set_page_config(page_title="🐟 Cat Kiss Fish & Shopify Order Comparator 🛍️", layout="wide")
+    st.title("🐟 Cat Kiss Fish & Shopify Order Comparator 🛍️")
+
+# 🔥 Cache warm-up progress (published by comparator.cache_warmup after each deploy); an entry
+# that stopped updating belongs to a warm-up that died and is not shown
+def render_warmup_progress():
+    warmup_progress = get_shared_cache().get(WARMUP_PROGRESS_CACHE_KEY)
+    if (
+        warmup_progress is not MISSING
+        and warmup_progress["status"] == "running"
+        and time.time() - warmup_progress["updated_at"] < WARMUP_PROGRESS_STALE_AFTER
+    ):
+        warmup_total = warmup_progress["orders_total"] + warmup_progress["images_total"]
+        warmup_done = warmup_progress["orders_done"] + warmup_progress["images_done"]
+        st.sidebar.progress(
+            warmup_done / warmup_total if warmup_total else 0.0,
+            text=f"🔥 Warming caches: {warmup_progress['orders_done']}/{warmup_progress['orders_total']} orders, "
+                 f"{warmup_progress['images_done']}/{warmup_progress['images_total']} images"
+        )
+
+# 📥 Input Field in Sidebar for Multiple Orders; returns the input mode and the entered text
+def render_order_input():
+    # 📥 Multiple Order Input Instructions
+    st.sidebar.header("📥 Enter Multiple Order Numbers")
+    input_mode = st.sidebar.radio("🧭 Input Mode", options=[INPUT_MODE_PAIRS, INPUT_MODE_AUTO_MATCH])
+
+    if input_mode == INPUT_MODE_AUTO_MATCH:
+        order_input = st.sidebar.text_area(
+            "🔍 Enter Cat Kiss Fish Order Numbers",
+            """2024091112121444123628
+2024091110490123363860
+2024091110540123144343"""
+        )
+    else:
+        order_input = st.sidebar.text_area(
+            "🔍 Enter Order Numbers",
+            """2024091112121444123628 G61226
+2024091110490123363860 C61227
+2024091110540123144343 U61228"""
+        )
+    return input_mode, order_input
+
+# Parse the input into a list of (Cat Kiss Fish, Shopify) order pairs with store prefix
+def parse_order_input(order_input_text):
+    order_pairs = []
+    lines = order_input_text.strip().split('\n')
+    for idx, line in enumerate(lines, start=1):
+        if line.strip():  # Ignore empty lines
+            parts = line.strip().split()
+            if len(parts) == 2:
+                cat_order, shop_order = parts
+                if len(shop_order) < 1:
+                    st.sidebar.warning(f"Invalid Shopify order name in line {idx}: '{line}'.")
+                    continue
+                store_prefix = shop_order[0].upper()
+                if store_prefix in SHOPIFY_STORES:
+                    order_pairs.append((cat_order, shop_order, store_prefix))
+                else:
+                    st.sidebar.warning(f"Unknown store prefix '{store_prefix}' in line {idx}: '{line}'. Expected prefixes: {', '.join(SHOPIFY_STORES.keys())}.")
+            else:
+                st.sidebar.warning(f"Invalid format in line {idx}: '{line}'. Expected two order numbers separated by a space.")
+    return order_pairs
+
+# Parse Cat Kiss Fish order numbers and find their Shopify orders through the order index. The
+# matches are kept in the session per input and index generation, so reruns from clicks and pair
+# switches neither reload the entered orders nor match them again until the index changes
+def parse_catkissfish_only_input(order_input_text, access_token, profiler):
+    profiler.phase("fetch")  # Matching needs the index and every entered order, so it is all fetching
+    order_index = get_order_index()
+    with st.spinner("🔄 Updating Shopify order index..."), profiler.span("order index refresh"):
+        refresh_errors = order_index.refresh(SHOPIFY_STORES)
+    for store_prefix, error in refresh_errors.items():
+        st.sidebar.warning(f"Could not update the order index for store '{store_prefix}': {error}")
+
+    match_key = (order_input_text, order_index.generation)
+    auto_match = st.session_state.get("auto_match")
+    if auto_match is None or auto_match["key"] != match_key:
+        auto_match = match_catkissfish_orders(order_input_text, order_index, access_token, profiler)
+        auto_match["key"] = match_key
+        if auto_match["complete"]:  # Orders that could not be loaded are tried again on the next run
+            st.session_state["auto_match"] = auto_match
+    for warning in auto_match["warnings"]:
+        st.sidebar.warning(warning)
+    return auto_match["order_pairs"]
+
+# 🔗 Match every entered Cat Kiss Fish order against the order index; returns the order pairs,
+# the warnings to show for the other lines, and whether every entered order could be loaded
+def match_catkissfish_orders(order_input_text, order_index, access_token, profiler):
+    auto_match = {"order_pairs": [], "warnings": [], "complete": False}
+    if not access_token:
+        auto_match["warnings"].append("Unable to retrieve Cat Kiss Fish access token; orders cannot be matched automatically.")
+        return auto_match
+
+    lines = order_input_text.strip().split('\n')
+
+    # ⚡ Load the entered orders that are not in the in-process cache concurrently first; failures
+    # are reported by the lookups below
+    order_ids = [line.strip() for line in lines if len(line.split()) == 1]
+    missing_order_ids = [order_id for order_id in order_ids if (order_id, access_token) not in get_catkissfish_order_details.cache]
+    if len(missing_order_ids) > 1:
+        from comparator.async_client import get_background_loop, load_catkissfish_orders  # aiohttp is only loaded for batches
+
+        background_loop = get_background_loop()
+        with st.spinner(f"🔄 Loading {len(missing_order_ids)} Cat Kiss Fish orders..."), profiler.span("catkissfish orders"):
+            background_loop.run(load_catkissfish_orders(background_loop.client, access_token, missing_order_ids))
+
+    auto_match["complete"] = True
+    for idx, line in enumerate(lines, start=1):
+        if line.strip():  # Ignore empty lines
+            parts = line.strip().split()
+            if len(parts) != 1:
+                auto_match["warnings"].append(f"Invalid format in line {idx}: '{line}'. Expected one Cat Kiss Fish order number.")
+                continue
+            cat_order = parts[0]
+            catkissfish_order = get_catkissfish_order_details(cat_order, access_token)
+            if not catkissfish_order:
+                auto_match["warnings"].append(f"Cat Kiss Fish order '{cat_order}' in line {idx} could not be loaded.")
+                auto_match["complete"] = False
+                continue
+            candidates = order_index.lookup(catkissfish_order.user_name, catkissfish_order.postal_code, catkissfish_order.order_date)
+            if len(candidates) == 1:
+                store_prefix, shop_order = candidates[0]
+                auto_match["order_pairs"].append((cat_order, shop_order, store_prefix))
+            elif candidates:
+                auto_match["warnings"].append(f"Several Shopify orders match '{cat_order}' in line {idx}: {', '.join(name for _, name in candidates)}. Enter the pair manually.")
+            else:
+                auto_match["warnings"].append(f"No Shopify order matches '{cat_order}' in line {idx}.")
+    return auto_match
+
+# ⚡ Load every entered pair on the background loop, once per input, so that switching between
+# pairs finds their orders and variant images already in the shared cache, and, when design
+# images are compared, their image hashes already computed. Returns the batch's progress, or
+# None for a single pair
+def start_batch(order_pairs, access_token, compare_design_images):
+    if len(order_pairs) < 2:
+        return None
+    batch_progress = st.session_state.get("batch_progress")
+    if batch_progress is not None and batch_progress.order_pairs == order_pairs:
+        return batch_progress
+    if not access_token:
+        return None
+    from comparator.async_client import get_background_loop, prefetch_order_pairs  # aiohttp is only loaded for batches
+
+    batch_progress = st.session_state["batch_progress"] = BatchProgress(order_pairs)
+    background_loop = get_background_loop()
+    background_loop.submit(prefetch_order_pairs(
+        background_loop.client, SHOPIFY_STORES, access_token, order_pairs, batch_progress.completions, hash_images=compare_design_images
+    ))
+    return batch_progress
+
+# 📡 Live status of the batch: progress, throughput, errors and a table of pairs. The fragment
+# redraws itself every BATCH_REFRESH_SECONDS while pairs are loading; selecting a finished row
+# opens its comparison without waiting for the rest
+def render_batch_status(batch_progress):
+    batch_progress.drain()
+    in_full_run = [True]  # Fragment reruns reuse this closure after the full run has ended
+
+    @st.fragment(run_every=None if batch_progress.finished else BATCH_REFRESH_SECONDS)
+    def batch_status():
+        batch_progress.drain()
+        total = len(batch_progress.order_pairs)
+
+        st.markdown("### 📡 **Batch Progress** 📡")
+        st.progress(batch_progress.completed / total, text=f"{batch_progress.completed}/{total} pairs loaded")
+        metric_cols = st.columns(3)
+        metric_cols[0].metric("Completed", f"{batch_progress.completed}/{total}")
+        metric_cols[1].metric("Pairs / s", f"{batch_progress.pairs_per_second():.1f}")
+        metric_cols[2].metric("Errors", batch_progress.errors)
+
+        table_event = st.dataframe(
+            batch_progress.rows(),
+            hide_index=True,
+            on_select="rerun",
+            selection_mode="single-row",
+            key=f"batch_table_{batch_progress.batch_id}"
+        )
+        # A selection opens its pair once; clearing it (or a new batch) lets the same row open again
+        selected_rows = table_event.selection.rows
+        selection = (batch_progress.batch_id, selected_rows)
+        if not selected_rows:
+            st.session_state.pop("handled_batch_selection", None)
+        elif selection != st.session_state.get("handled_batch_selection"):
+            if batch_progress.is_completed(selected_rows[0]):
+                st.session_state["handled_batch_selection"] = selection
+                st.session_state["open_pair_index"] = selected_rows[0]
+                st.rerun()
+            st.caption(f"⏳ Pair {selected_rows[0] + 1} is still loading; it opens as soon as it is ready.")
+
+        # One full rerun when the batch ends stops the refresh timer. Only timer runs ask for it:
+        # a full run sets the timer itself, and rerunning it would drop the click that started it
+        if batch_progress.finished and not in_full_run[0]:
+            st.rerun()
+
+    batch_status()
+    in_full_run[0] = False
+    st.markdown("---")
+
+# 🗂️ List the order pairs in the sidebar and compare the selected one
+def render_selected_pair(order_pairs, access_token, compare_design_images, profiler):
+    st.sidebar.markdown("---")
+    st.sidebar.header("🗂️ Select an Order to Compare")
+
+    # Create a list of order identifiers for selection (e.g., "1: 2024091112121444123628 vs G61226 (Store G)")
+    order_identifiers = [f"{idx+1}: {pair[0]} vs {pair[1]} (Store {pair[2]})" for idx, pair in enumerate(order_pairs)]
+
+    # A row picked in the batch status table selects its pair before the radio is drawn
+    if "open_pair_index" in st.session_state:
+        st.session_state["selected_pair_index"] = st.session_state.pop("open_pair_index")
+    if st.session_state.get("selected_pair_index", 0) >= len(order_pairs):
+        st.session_state.pop("selected_pair_index")
+
+    # Display all orders using radio buttons
+    selected_order_idx = st.sidebar.radio("🔽 Select an Order", options=range(len(order_pairs)), format_func=lambda x: order_identifiers[x], key="selected_pair_index")
+
+    # Get the selected order pair
+    selected_cat_order, selected_shop_order, selected_store_prefix = order_pairs[selected_order_idx]
+
+    # 📦 Reopen approved comparisons from the archive unless a refetch was requested; unapproved
+    # ones are fetched again so a transient failure on the first view is not frozen. A refetch
+    # still compares against the archived copy, so an unchanged comparison keeps its approval
+    comparison_archive = get_comparison_archive()
+    refetch_requested = st.session_state.pop("refetch_pair", None) == (selected_cat_order, selected_shop_order)
+    profiler.phase("fetch")
+    with profiler.span("archive lookup"):
+        archived = comparison_archive.load(selected_cat_order, selected_shop_order)
+
+    if archived and archived["approved_at"] and not refetch_requested:
+        profiler.phase("render")
+        st.info(f"📦 Loaded from the comparison archive (archived {format_timestamp(archived['archived_at'])}, approved {format_timestamp(archived['approved_at'])}).\n**Cat Kiss Fish Order:** {selected_cat_order}\n**Shopify Order:** {selected_shop_order} (Store '{selected_store_prefix}')")
+        render_comparison(archived["payload"]["comparison"])
+        render_archive_controls(comparison_archive, selected_cat_order, selected_shop_order, approved_at=archived["approved_at"])
+        return
+
+    # Automatically trigger comparison upon selection
+    # 🐟 Fetch Cat Kiss Fish Order Details
+    if access_token:
+        with st.spinner(f"📥 Fetching Cat Kiss Fish order details for Order {selected_cat_order}..."), profiler.span("catkissfish order"):
+            catkissfish_order = get_catkissfish_order_details(selected_cat_order, access_token)
+    else:
+        st.error("❌ Unable to retrieve Cat Kiss Fish access token.")
+        catkissfish_order = None
+
+    # 🛍️ Fetch Shopify Order Details
+    with st.spinner(f"📥 Fetching Shopify order details for Order {selected_shop_order} from Store '{selected_store_prefix}'..."), profiler.span("shopify order"):
+        shopify_orders = get_shopify_order_details(selected_shop_order, selected_store_prefix)
+
+    if not shopify_orders:
+        shopify_order = None
+    else:
+        # Assuming order numbers are unique, take the first matched order
+        shopify_order = shopify_orders[0]
+
+    # 🖼️ Display the Results
+    profiler.phase("assemble")
+    if catkissfish_order and shopify_order:
+        st.success(f"✅ Both Order Details Retrieved Successfully!\n**Cat Kiss Fish Order:** {selected_cat_order}\n**Shopify Order:** {selected_shop_order} (Store '{selected_store_prefix}')")
+        comparison = assemble_comparison(catkissfish_order, shopify_order, selected_store_prefix, profiler)
+
+        # 🖼️ Draw the page first; design images are downloaded and scored afterwards (batches
+        # hash them in the background, so their pairs are usually scored from the hash cache)
+        profiler.phase("render")
+        show_similarity = render_comparison(comparison, similarity_pending=compare_design_images)
+        review_container = st.container()
+        if compare_design_images:
+            score_comparison(comparison, profiler)
+            show_similarity(comparison["similarity_scores"])
+
+        # 💾 Archive the comparison for review when every lookup succeeded and it differs from the
+        # latest archived one; once approved, reopening it needs no upstream calls
+        unchanged = archived and archived["payload"]["comparison"] == comparison
+        if comparison["complete"] and not unchanged:
+            with profiler.span("archive save"):
+                comparison_archive.save(selected_cat_order, selected_shop_order, selected_store_prefix, {
+                    "catkissfish_order": catkissfish_order.to_projection(),
+                    "shopify_order": shopify_order.to_projection(),
+                    "comparison": comparison
+                })
+
+        with review_container:
+            render_archive_controls(
+                comparison_archive, selected_cat_order, selected_shop_order,
+                archived=comparison["complete"], approved_at=archived["approved_at"] if unchanged else None
+            )
+    else:
+        st.error("❌ Unable to retrieve one or both order details. Please check the order numbers and try again.")
+
+# 📊 Entries, bytes and hit rates of the in-process caches (a Markdown table, so that pandas
+# is not imported just for this)
+def render_cache_stats():
+    cache_stats = all_cache_stats()
+    columns = list(cache_stats[0]) if cache_stats else []
+    table = [f"| {' | '.join(columns)} |", f"|{'---|' * len(columns)}"]
+    table += [f"| {' | '.join(str(row[column]) for column in columns)} |" for row in cache_stats]
+    with st.sidebar.expander("📊 Cache Stats"):
+        st.markdown("\n".join(table))
+
+# ⏱️ Phase durations and downloads of an opt-in profile
+def render_profile(profiler):
+    profiler.stop()
+    if profiler.enabled:
+        st.sidebar.markdown("---")
+        st.sidebar.header("⏱️ Profile of This Run")
+        for phase_name, duration in profiler.phase_durations().items():
+            st.sidebar.write(f"**{phase_name}:** {duration * 1000:.0f} ms")
+        st.sidebar.download_button("📈 Download Timeline (Chrome Trace)", profiler.timeline_json(), file_name="comparator-timeline.json", mime="application/json")
+        st.sidebar.download_button("🔥 Download Hot Functions", profiler.top_functions(), file_name="comparator-hot-functions.txt", mime="text/plain")
+
+# 🎨 One run of the page script
+def main():
+    render_page_header()
+
+    # ⏱️ Opt-in profiling of this script run (COMPARATOR_PROFILE=1 or ?profile=1)
+    profiler = RunProfiler(profiling_requested(st.query_params))
+    try:
+        profiler.phase("parse")
+
+        render_warmup_progress()
+        input_mode, order_input = render_order_input()
+
+        # 🐟 One Cat Kiss Fish token per run, shared by auto-matching, the batch and the selected pair
+        access_token = None
+        if order_input.strip():
+            profiler.phase("fetch")
+            with st.spinner("🔄 Fetching Cat Kiss Fish access token..."), profiler.span("catkissfish token"):
+                access_token = get_catkissfish_access_token(CATKISSFISH_CLIENT_ID, CATKISSFISH_CLIENT_SECRET)
+            profiler.phase("parse")
+
+        if input_mode == INPUT_MODE_AUTO_MATCH:
+            order_pairs = parse_catkissfish_only_input(order_input, access_token, profiler)
+        else:
+            order_pairs = parse_order_input(order_input)
+
+        # 🖼️ Optional perceptual-hash comparison of effect images against variant images
+        compare_design_images = st.sidebar.checkbox("🖼️ Compare Design Images", value=True)
+        batch_progress = start_batch(order_pairs, access_token, compare_design_images)
+
+        if batch_progress is not None:
+            render_batch_status(batch_progress)
+        if order_pairs:
+            render_selected_pair(order_pairs, access_token, compare_design_images, profiler)
+        else:
+            # Removed the example and guide lines from the sidebar
+            st.sidebar.warning("⚠️ Please enter at least one pair of order numbers to compare.")
+
+        render_cache_stats()
+        render_profile(profiler)
+    finally:
+        # st.rerun(), Streamlit stopping a run for a new interaction and errors all leave through
+        # here; cProfile must not stay enabled on the script thread
+        profiler.stop()
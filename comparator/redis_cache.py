@@ -0,0 +1,100 @@
+# redis_cache.py
+#
+# Shared cache on a Redis-protocol server, so app processes on several machines share order
+# payloads, variant image lookups and the Cat Kiss Fish token. Selected by setting REDIS_URL:
+#
+#   REDIS_URL=redis://localhost:6379/0 streamlit run order_comparison_app.py
+#
+# Any server speaking the Redis protocol works (Redis, Valkey, KeyDB), which includes a local
+# stand-in for development, e.g. fakeredis's TCP server:
+#
+#   python -c "import fakeredis; fakeredis.TcpFakeServer(('127.0.0.1', 6379)).serve_forever()"
+
+import time
+import uuid
+
+import redis
+
+from comparator.json_codec import dumps, loads
+from comparator.order_cache import MISSING, ORDER_CACHE_STALE_RETENTION, SHARED_LOCK_TTL
+
+# ==========================================
+# ⚙️ Redis Cache Settings
+# ==========================================
+
+REDIS_KEY_PREFIX = "comparator:"  # Keeps the cache apart from anything else on the same server
+REDIS_SOCKET_TIMEOUT = 5
+
+# ==========================================
+# 🗄️ Redis-Backed Shared Cache
+# ==========================================
+
+# 🗄️ Same methods as SharedCache. Each entry is a hash of its value, expiry and validators;
+# entries with validators outlive their TTL by ORDER_CACHE_STALE_RETENTION so they can still
+# be revalidated, and Redis drops everything else on expiry
+class RedisCache:
+    def __init__(self, url):
+        self.url = url
+        self._client = redis.Redis.from_url(url, socket_timeout=REDIS_SOCKET_TIMEOUT, health_check_interval=30)
+
+    def _key(self, key):
+        return REDIS_KEY_PREFIX + key
+
+    def _retention_ms(self, ttl, has_validators):
+        return int((ttl + (ORDER_CACHE_STALE_RETENTION if has_validators else 0)) * 1000)
+
+    def get(self, key):
+        value, expires_at = self._client.hmget(self._key(key), "value", "expires_at")
+        if value is None or float(expires_at) <= time.time():
+            return MISSING
+        return loads(value)
+
+    def set(self, key, value, ttl, validators=None):
+        entry = {"value": dumps(value), "expires_at": time.time() + ttl}
+        if validators:
+            entry["validators"] = dumps(validators)
+        pipeline = self._client.pipeline()
+        pipeline.delete(self._key(key))
+        pipeline.hset(self._key(key), mapping=entry)
+        pipeline.pexpire(self._key(key), self._retention_ms(ttl, bool(validators)))
+        pipeline.execute()
+
+    # 🕰️ An expired entry that can still be revalidated, as (value, validators); MISSING otherwise
+    def get_stale(self, key):
+        value, validators = self._client.hmget(self._key(key), "value", "validators")
+        if value is None or validators is None:
+            return MISSING
+        return loads(value), loads(validators)
+
+    # 🕰️ Give a revalidated entry a fresh TTL
+    def touch(self, key, ttl):
+        if not self._client.hexists(self._key(key), "value"):
+            return
+        has_validators = self._client.hexists(self._key(key), "validators")
+        pipeline = self._client.pipeline()
+        pipeline.hset(self._key(key), "expires_at", time.time() + ttl)
+        pipeline.pexpire(self._key(key), self._retention_ms(ttl, has_validators))
+        pipeline.execute()
+
+    def delete(self, key):
+        self._client.delete(self._key(key))
+
+    # 🔒 Take a cross-process lock without waiting (SET NX PX); returns the owner token, or None when it is held
+    def acquire_lock(self, name, ttl=SHARED_LOCK_TTL):
+        owner = uuid.uuid4().hex
+        if self._client.set(self._key(name), owner, nx=True, px=int(ttl * 1000)):
+            return owner
+        return None
+
+    # 🔒 Release a lock, unless it expired and another process has taken it since
+    def release_lock(self, name, owner):
+        with self._client.pipeline() as pipeline:
+            try:
+                pipeline.watch(self._key(name))
+                if pipeline.get(self._key(name)) != owner.encode("utf-8"):
+                    return
+                pipeline.multi()
+                pipeline.delete(self._key(name))
+                pipeline.execute()
+            except redis.WatchError:
+                pass  # Changed hands between the check and the delete
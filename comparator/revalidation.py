@@ -0,0 +1,33 @@
+# revalidation.py
+#
+# Helpers for conditional requests. Fetch functions record the validators (ETag /
+# Last-Modified) of every response they read; when the cached result expires, the same
+# requests are repeated with If-None-Match / If-Modified-Since, and if every one of them
+# answers 304 the cached result is still current.
+
+# 🏷️ Validators carried by a response; empty when the upstream sends none
+def response_validators(response):
+    validators = {}
+    if response.headers.get("ETag"):
+        validators["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        validators["last_modified"] = response.headers["Last-Modified"]
+    return validators
+
+# 🏷️ Conditional request headers for one recorded response
+def conditional_headers(validators):
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+# 🏷️ Record the validators of a response in a list passed in by the caller
+def record_validators(validators, response, **request):
+    if validators is not None:
+        validators.append({**request, **response_validators(response)})
+
+# 🏷️ A cached result can only be revalidated when every response behind it had validators
+def can_revalidate(validators):
+    return bool(validators) and all(entry.get("etag") or entry.get("last_modified") for entry in validators)
@@ -0,0 +1,112 @@
+# run_profiler.py
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+
+# ==========================================
+# ⚙️ Profiling Settings
+# ==========================================
+
+PROFILE_ENV_VAR = "COMPARATOR_PROFILE"  # COMPARATOR_PROFILE=1 profiles every script run
+PROFILE_QUERY_PARAM = "profile"  # ...or open the app with ?profile=1
+PROFILE_TOP_N = 40
+
+# 🔍 Whether this script run should be profiled
+def profiling_requested(query_params):
+    enabled_values = ("1", "true", "yes", "on")
+    return (
+        os.getenv(PROFILE_ENV_VAR, "").strip().lower() in enabled_values
+        or str(query_params.get(PROFILE_QUERY_PARAM, "")).strip().lower() in enabled_values
+    )
+
+# ==========================================
+# ⏱️ Per-Run Profiler
+# ==========================================
+
+# ⏱️ Wraps one script run in cProfile and records named spans; a no-op when disabled
+class RunProfiler:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.spans = []  # (name, category, start, end, thread name) with times relative to the run start
+        self._start = time.perf_counter()
+        self._phase = None
+        self._profiler = None
+        if enabled:
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Another session is already being profiled; keep the span timeline only
+                self._profiler = None
+
+    def _now(self):
+        return time.perf_counter() - self._start
+
+    # 🏷️ Start a top-level phase (parse, fetch, assemble, render), closing the previous one
+    def phase(self, name):
+        if not self.enabled:
+            return
+        now = self._now()
+        if self._phase is not None:
+            self.spans.append((self._phase[0], "phase", self._phase[1], now, threading.current_thread().name))
+        self._phase = (name, now) if name else None
+
+    # 🏷️ Tag a nested span, e.g. a single upstream call inside the fetch phase
+    @contextmanager
+    def span(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = self._now()
+        try:
+            yield
+        finally:
+            self.spans.append((name, "span", start, self._now(), threading.current_thread().name))
+
+    def stop(self):
+        if not self.enabled:
+            return
+        self.phase(None)
+        if self._profiler is not None:
+            self._profiler.disable()
+
+    # 📈 Spans in Chrome trace event format (open in chrome://tracing or ui.perfetto.dev)
+    def timeline_json(self):
+        events = [
+            {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round(start * 1e6),
+                "dur": round((end - start) * 1e6),
+                "pid": os.getpid(),
+                "tid": thread_name
+            }
+            for name, category, start, end, thread_name in self.spans
+        ]
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}, indent=1)
+
+    # 🔥 The hottest functions by cumulative time, as a pstats text report
+    def top_functions(self, limit=PROFILE_TOP_N):
+        if self._profiler is None:
+            return "cProfile was not active for this run (another run was being profiled)."
+        output = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=output)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+        output.write("\n")
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(limit)
+        return output.getvalue()
+
+    # 📋 Phase durations in seconds, for the sidebar summary
+    def phase_durations(self):
+        durations = {}
+        for name, category, start, end, _ in self.spans:
+            if category == "phase":
+                durations[name] = durations.get(name, 0.0) + end - start
+        return durations
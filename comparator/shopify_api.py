@@ -0,0 +1,138 @@
+# shopify_api.py
+
+import requests
+
+from comparator.json_codec import decode_response
+from comparator.revalidation import can_revalidate, conditional_headers, record_validators
+
+# ==========================================
+# 🌐 Shopify Admin API Settings
+# ==========================================
+
+SHOPIFY_API_VERSION = "2023-10"
+SHOPIFY_PAGE_LIMIT = 250  # Maximum page size allowed by the Shopify REST API
+
+# Only the fields needed to match orders are requested when listing
+SHOPIFY_ORDER_INDEX_FIELDS = "id,name,created_at,updated_at,cancelled_at,customer,shipping_address"
+
+# ==========================================
+# ⚠️ Errors
+# ==========================================
+
+# ⚠️ Raised for non-200 responses; keeps the body so callers can show it for debugging
+class ShopifyAPIError(Exception):
+    def __init__(self, message, response_text=None):
+        super().__init__(message)
+        self.response_text = response_text
+
+# ==========================================
+# 🚀 Functions to Interact with the Shopify Admin API
+# ==========================================
+
+# 🛍️ Build the request headers for a configured store
+def shopify_headers(store):
+    return {
+        "Content-Type": "application/json",
+        "X-Shopify-Access-Token": store['access_token']
+    }
+
+# 🛍️ Build an Admin API URL for a configured store
+def shopify_url(store, path):
+    return f"https://{store['url']}/admin/api/{SHOPIFY_API_VERSION}/{path}"
+
+# 🛍️ GET an Admin API resource and decode it, raising ShopifyAPIError on HTTP errors; the
+# response validators are appended to `validators` when a list is passed
+def _get_json(store, path, description, params=None, timeout=30, validators=None):
+    response = requests.get(shopify_url(store, path), headers=shopify_headers(store), params=params, timeout=timeout)
+    if response.status_code != 200:
+        raise ShopifyAPIError(f"HTTP Error {response.status_code} while fetching {description}.", response.text)
+    record_validators(validators, response, path=path, params=params)
+    return decode_response(response, "shopify-" + path.split("/")[0].removesuffix(".json"))
+
+# 🛍️ Fetch the orders matching an order name such as "G61226"
+def fetch_shopify_orders(store, order_number, validators=None):
+    return _get_json(store, "orders.json", "Shopify order details", params={"name": order_number}, validators=validators).get("orders", [])
+
+# 🛍️ Resolve the image of a variant, falling back to the product's default image
+def fetch_shopify_variant_image_url(store, variant_id, validators=None):
+    variant = _get_json(store, f"variants/{variant_id}.json", f"Shopify variant {variant_id} details", validators=validators).get("variant", {})
+    image_id = variant.get("image_id")
+    product_id = variant.get("product_id")
+    if image_id and product_id:
+        image = _get_json(store, f"products/{product_id}/images/{image_id}.json", f"Shopify image {image_id} details", validators=validators).get("image", {})
+        return image.get("src")
+    if product_id:
+        return fetch_shopify_default_product_image_url(store, product_id, validators)
+    return None
+
+# 🛍️ Resolve the first image of a product
+def fetch_shopify_default_product_image_url(store, product_id, validators=None):
+    product = _get_json(store, f"products/{product_id}.json", f"Shopify product {product_id} details", validators=validators).get("product", {})
+    images = product.get("images", [])
+    if images:
+        return images[0].get("src")  # Return the first image as default
+    return None
+
+# 🛍️ Repeat the requests behind a cached result conditionally; True only when every resource
+# answers 304 Not Modified. Any other answer, or a failed request, counts as changed
+def shopify_resources_unchanged(store, validators, timeout=30):
+    if not can_revalidate(validators):
+        return False
+    for entry in validators:
+        headers = {**shopify_headers(store), **conditional_headers(entry)}
+        try:
+            response = requests.get(shopify_url(store, entry["path"]), headers=headers, params=entry.get("params"), timeout=timeout)
+        except requests.RequestException:
+            return False
+        if response.status_code != 304:
+            return False
+    return True
+
+# 🛍️ Fetch all orders updated since `updated_at_min`, following the cursor pagination links
+def fetch_recent_shopify_orders(store, updated_at_min, fields=SHOPIFY_ORDER_INDEX_FIELDS, timeout=30):
+    params = {
+        "status": "any",
+        "limit": SHOPIFY_PAGE_LIMIT,
+        "updated_at_min": updated_at_min,
+        "fields": fields
+    }
+    url = shopify_url(store, "orders.json")
+    orders = []
+    while url:
+        response = requests.get(url, headers=shopify_headers(store), params=params, timeout=timeout)
+        response.raise_for_status()
+        orders.extend(decode_response(response, "shopify-orders").get("orders", []))
+        # Follow-up pages only accept the page_info cursor carried in the "next" link
+        url = response.links.get("next", {}).get("url")
+        params = None
+    return orders
+
+# ==========================================
+# ✂️ Order Filtering and Projection
+# ==========================================
+
+# ✂️ Drop "Versand"/"shipping" line items; orders left without products are dropped entirely
+def filter_shipping_line_items(orders):
+    filtered_orders = []
+    for order in orders:
+        filtered_line_items = [
+            item for item in order.get("line_items", [])
+            if "versand" not in item.get("name", "").lower() and "shipping" not in item.get("name", "").lower()
+        ]
+        if filtered_line_items:
+            filtered_orders.append({**order, "line_items": filtered_line_items})
+    return filtered_orders
+
+def _pick(source, keys):
+    return {key: source[key] for key in keys if key in source}
+
+# ✂️ Keep only the order fields the comparator and order index use
+def project_shopify_order(order):
+    projected = _pick(order, ("id", "name", "order_number", "created_at", "updated_at", "cancelled_at"))
+    projected["customer"] = _pick(order.get("customer") or {}, ("first_name", "last_name"))
+    projected["shipping_address"] = _pick(order.get("shipping_address") or {}, ("name", "first_name", "last_name", "address1", "zip"))
+    projected["line_items"] = [
+        _pick(item, ("name", "variant_title", "quantity", "variant_id", "product_id", "properties"))
+        for item in order.get("line_items", [])
+    ]
+    return projected
@@ -0,0 +1,139 @@
+# startup_benchmark.py
+#
+# Measures how quickly the page comes up and checks it against the cold-start budget:
+#
+#   python -m comparator.startup_benchmark                  # exits 1 when over budget
+#   python -m comparator.startup_benchmark --runs 10 --json startup.json
+#
+# "First paint" is the header, the warm-up progress and the order input, i.e. everything the
+# page draws before its first upstream lookup. Each run starts a fresh interpreter and times:
+#   cold start  - process start until the first paint is complete
+#   rerun       - the same first paint again in the now warm process (paid on every interaction)
+#   rerun import - re-executing the entry script's import in the warm process
+# Timings go through Streamlit's AppTest harness, which adds a little of its own overhead.
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# ==========================================
+# ⏱️ Cold-Start Budget
+# ==========================================
+
+COLD_START_BUDGET_SECONDS = float(os.getenv("COLD_START_BUDGET_SECONDS", "2.0"))
+RERUN_BUDGET_SECONDS = float(os.getenv("RERUN_BUDGET_SECONDS", "0.1"))
+RERUN_IMPORT_BUDGET_SECONDS = float(os.getenv("RERUN_IMPORT_BUDGET_SECONDS", "0.001"))
+
+RERUNS_PER_PROCESS = 5
+
+# ==========================================
+# 🧪 Measured Child Process
+# ==========================================
+
+# 🎨 Script run by AppTest: the part of comparator.page.main() that draws before any lookup
+def _first_paint_script():
+    from comparator.page import render_order_input, render_page_header, render_warmup_progress
+
+    render_page_header()
+    render_warmup_progress()
+    render_order_input()
+
+# 🧪 Runs in the fresh interpreter; reports each milestone as one JSON line on stdout
+def _measure_child(reruns):
+    from streamlit.testing.v1 import AppTest
+
+    app_test = AppTest.from_function(_first_paint_script, default_timeout=60)
+    app_test.run()
+    _report(event="first_paint", exceptions=[str(exception.value) for exception in app_test.exception])
+
+    rerun_times = []
+    for _ in range(reruns):
+        started = time.perf_counter()
+        app_test.run()
+        rerun_times.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        exec("from comparator.page import main")
+    rerun_import_time = (time.perf_counter() - started) / 1000
+
+    _report(event="done", rerun=statistics.median(rerun_times), rerun_import=rerun_import_time)
+
+def _report(**values):
+    print(json.dumps(values), flush=True)
+
+# ==========================================
+# 📏 Benchmark Driver
+# ==========================================
+
+# 📏 One fresh process: cold start from spawn to the first-paint milestone, plus rerun timings
+def measure_once(reruns=RERUNS_PER_PROCESS):
+    started = time.perf_counter()
+    child = subprocess.Popen(
+        [sys.executable, "-m", "comparator.startup_benchmark", "--child", "--reruns", str(reruns)],
+        stdout=subprocess.PIPE,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    result = {}
+    for line in child.stdout:
+        if not line.startswith("{"):
+            continue
+        milestone = json.loads(line)
+        if milestone["event"] == "first_paint":
+            result["cold_start"] = time.perf_counter() - started
+            if milestone["exceptions"]:
+                raise RuntimeError(f"The first paint raised: {milestone['exceptions']}")
+        elif milestone["event"] == "done":
+            result["rerun"] = milestone["rerun"]
+            result["rerun_import"] = milestone["rerun_import"]
+    if child.wait() != 0 or len(result) != 3:
+        raise RuntimeError("The measured process did not finish its first paint.")
+    return result
+
+# 📏 Median timings over several fresh processes, with the budget each one is held to
+def run_benchmark(runs):
+    samples = [measure_once() for _ in range(runs)]
+    budgets = {"cold_start": COLD_START_BUDGET_SECONDS, "rerun": RERUN_BUDGET_SECONDS, "rerun_import": RERUN_IMPORT_BUDGET_SECONDS}
+    return {
+        name: {
+            "median_seconds": statistics.median(sample[name] for sample in samples),
+            "max_seconds": max(sample[name] for sample in samples),
+            "budget_seconds": budget
+        }
+        for name, budget in budgets.items()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold start and rerun cost of the comparator page.")
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh processes to measure")
+    parser.add_argument("--json", metavar="FILE", help="also write the results to FILE for tracking over time")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--reruns", type=int, default=RERUNS_PER_PROCESS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _measure_child(args.reruns)
+        return
+
+    results = run_benchmark(args.runs)
+    over_budget = []
+    for name, result in results.items():
+        within = result["median_seconds"] <= result["budget_seconds"]
+        if not within:
+            over_budget.append(name)
+        print(
+            f"{'✅' if within else '❌'} {name:<13} median {result['median_seconds'] * 1000:8.2f} ms, "
+            f"max {result['max_seconds'] * 1000:8.2f} ms, budget {result['budget_seconds'] * 1000:8.2f} ms"
+        )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as results_file:
+            json.dump({"measured_at": time.time(), "runs": args.runs, "results": results}, results_file, indent=2)
+    sys.exit(1 if over_budget else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# webhook_receiver.py
+#
+# Receives Shopify orders/create and orders/updated webhooks and warms the shared
+# order cache so orders are ready before an operator pastes them into the comparator.
+#
+#   python -m comparator.webhook_receiver --port 8502
+#   python -m comparator.webhook_receiver --record recorded_webhooks/        # also save every delivery
+#   python -m comparator.webhook_receiver --replay recorded_webhooks/*.json  # re-run recorded deliveries locally
+
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from comparator.config import SHOPIFY_STORES
+from comparator.order_cache import MISSING, get_shared_cache, shopify_order_cache_key, shopify_variant_image_cache_key
+from comparator.shopify_api import fetch_shopify_variant_image_url, filter_shipping_line_items, project_shopify_order
+
+# ==========================================
+# ⚙️ Receiver Settings
+# ==========================================
+
+WEBHOOK_PATH = "/webhooks/shopify"
+WEBHOOK_TOPICS = {"orders/create", "orders/updated"}
+
+# Webhook-fed orders are kept current by orders/updated, so they can live much longer
+# than orders the app fetches on demand
+WEBHOOK_ORDER_CACHE_TTL = 24 * 3600
+WEBHOOK_VARIANT_IMAGE_CACHE_TTL = 3600
+VARIANT_IMAGE_REQUEST_INTERVAL = 0.5  # Stay under Shopify's REST rate limit of 2 requests/second
+
+# ==========================================
+# 🔐 Verification
+# ==========================================
+
+# 🔐 Check the X-Shopify-Hmac-Sha256 header against the raw request body
+def verify_webhook_hmac(body, hmac_header, secret):
+    if not hmac_header or not secret:
+        return False
+    digest = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).digest()
+    return hmac.compare_digest(base64.b64encode(digest).decode("ascii"), hmac_header)
+
+# 🔐 Sign a body the way Shopify does (used when replaying unsigned payloads)
+def sign_webhook_body(body, secret):
+    return base64.b64encode(hmac.new(secret.encode("utf-8"), body, hashlib.sha256).digest()).decode("ascii")
+
+# 🛍️ Find the store prefix a webhook came from by its shop domain
+def store_prefix_for_domain(shop_domain):
+    for store_prefix, store in SHOPIFY_STORES.items():
+        if store['url'] and shop_domain and store['url'].lower().rstrip("/") == shop_domain.lower():
+            return store_prefix
+    return None
+
+# ==========================================
+# 🖼️ Variant Image Pre-Resolution
+# ==========================================
+
+variant_image_queue = queue.Queue()
+
+# 🖼️ Resolve queued variant images one at a time and store them in the shared cache
+def resolve_variant_images_forever():
+    shared_cache = get_shared_cache()
+    while True:
+        store_prefix, variant_id = variant_image_queue.get()
+        try:
+            cache_key = shopify_variant_image_cache_key(store_prefix, variant_id)
+            if shared_cache.get(cache_key) is not MISSING:
+                continue
+            validators = []
+            image_url = fetch_shopify_variant_image_url(SHOPIFY_STORES[store_prefix], variant_id, validators)
+            shared_cache.set(cache_key, image_url, WEBHOOK_VARIANT_IMAGE_CACHE_TTL, validators)
+            time.sleep(VARIANT_IMAGE_REQUEST_INTERVAL)
+        except Exception as e:
+            print(f"⚠️ Could not resolve variant {variant_id} image for store '{store_prefix}': {e}")
+        finally:
+            variant_image_queue.task_done()
+
+# ==========================================
+# 📬 Webhook Handling
+# ==========================================
+
+# Shopify does not deliver orders/updated in order, so concurrent deliveries compare their
+# updated_at with the cached entry and write under this lock
+order_cache_write_lock = threading.Lock()
+
+# 🕰️ Parse an order's updated_at (ISO 8601 with offset); None when absent or malformed
+def parse_updated_at(value):
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+# 🕰️ Whether the cached orders were updated after the delivered one, i.e. the delivery arrived late
+def is_superseded(order, cached_orders):
+    if cached_orders is MISSING or not cached_orders:
+        return False
+    delivered_at = parse_updated_at(order.get("updated_at"))
+    cached_at = parse_updated_at(cached_orders[0].get("updated_at"))
+    return delivered_at is not None and cached_at is not None and delivered_at < cached_at
+
+# 📬 Verify, project and cache one delivery; returns (HTTP status, message)
+def handle_webhook(topic, shop_domain, hmac_header, body):
+    store_prefix = store_prefix_for_domain(shop_domain)
+    if store_prefix is None:
+        return 404, f"Unknown shop domain '{shop_domain}'"
+    if not verify_webhook_hmac(body, hmac_header, SHOPIFY_STORES[store_prefix]['webhook_secret']):
+        return 401, "HMAC verification failed"
+    if topic not in WEBHOOK_TOPICS:
+        return 200, f"Ignored topic '{topic}'"
+
+    order = json.loads(body)
+    order_name = order.get("name")
+    if not order_name:
+        return 200, "Ignored order without a name"
+
+    # Same filtering and projection the app applies to fetched orders
+    projected_orders = [project_shopify_order(filtered) for filtered in filter_shipping_line_items([order])]
+    cache_key = shopify_order_cache_key(store_prefix, order_name)
+    shared_cache = get_shared_cache()
+    with order_cache_write_lock:
+        if is_superseded(order, shared_cache.get(cache_key)):
+            return 200, f"Ignored delivery of order {order_name} older than the cached one"
+        if not projected_orders:
+            # Nothing left to compare; let the app fetch and report it as usual
+            shared_cache.delete(cache_key)
+            return 200, f"Order {order_name} has no comparable products"
+        shared_cache.set(cache_key, projected_orders, WEBHOOK_ORDER_CACHE_TTL)
+
+    for item in projected_orders[0]["line_items"]:
+        if item.get("variant_id"):
+            variant_image_queue.put((store_prefix, item["variant_id"]))
+    return 200, f"Cached order {order_name} for store '{store_prefix}'"
+
+# 📼 Save a delivery exactly as received so it can be replayed later
+def record_webhook(record_dir, topic, shop_domain, hmac_header, body):
+    os.makedirs(record_dir, exist_ok=True)
+    file_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{topic.replace('/', '-')}-{hashlib.sha1(body).hexdigest()[:8]}.json"
+    with open(os.path.join(record_dir, file_name), "w", encoding="utf-8") as record_file:
+        json.dump({"topic": topic, "shop_domain": shop_domain, "hmac": hmac_header, "body": body.decode("utf-8")}, record_file)
+
+# ==========================================
+# 🌐 HTTP Server
+# ==========================================
+
+class WebhookRequestHandler(BaseHTTPRequestHandler):
+    record_dir = None
+
+    def do_POST(self):
+        if self.path.split("?")[0] != WEBHOOK_PATH:
+            self._respond(404, "Not found")
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        topic = self.headers.get("X-Shopify-Topic", "")
+        shop_domain = self.headers.get("X-Shopify-Shop-Domain", "")
+        hmac_header = self.headers.get("X-Shopify-Hmac-Sha256", "")
+        if self.record_dir:
+            record_webhook(self.record_dir, topic, shop_domain, hmac_header, body)
+        try:
+            status, message = handle_webhook(topic, shop_domain, hmac_header, body)
+        except Exception as e:
+            status, message = 500, f"Exception occurred while handling webhook: {e}"
+        self._respond(status, message)
+
+    def do_GET(self):
+        # Health check
+        self._respond(200, "ok")
+
+    def _respond(self, status, message):
+        payload = message.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+# 📼 Feed recorded deliveries (or plain order JSON files) through the same handler
+def replay_webhooks(paths, store_prefix, topic):
+    for path in paths:
+        with open(path, encoding="utf-8") as replay_file:
+            recorded = json.load(replay_file)
+        if "body" in recorded and "topic" in recorded:
+            # A delivery saved with --record keeps its original headers and signature
+            body = recorded["body"].encode("utf-8")
+            status, message = handle_webhook(recorded["topic"], recorded["shop_domain"], recorded["hmac"], body)
+        else:
+            # A bare order payload is signed with the local secret of the chosen store
+            store = SHOPIFY_STORES[store_prefix]
+            body = json.dumps(recorded).encode("utf-8")
+            status, message = handle_webhook(topic, store['url'], sign_webhook_body(body, store['webhook_secret'] or ""), body)
+        print(f"{path}: {status} {message}")
+    variant_image_queue.join()
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the order cache from Shopify order webhooks.")
+    parser.add_argument("--port", type=int, default=int(os.getenv("WEBHOOK_PORT", "8502")))
+    parser.add_argument("--record", metavar="DIR", help="save every delivery to DIR for later replay")
+    parser.add_argument("--replay", nargs="+", metavar="FILE", help="replay recorded deliveries instead of serving")
+    parser.add_argument("--store", default="G", choices=sorted(SHOPIFY_STORES), help="store of bare order payloads when replaying")
+    parser.add_argument("--topic", default="orders/create", choices=sorted(WEBHOOK_TOPICS), help="topic of bare order payloads when replaying")
+    args = parser.parse_args()
+
+    threading.Thread(target=resolve_variant_images_forever, name="variant-images", daemon=True).start()
+    if args.replay:
+        replay_webhooks(args.replay, args.store, args.topic)
+        return
+
+    WebhookRequestHandler.record_dir = args.record
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), WebhookRequestHandler)
+    print(f"📬 Listening for Shopify webhooks on port {args.port}{WEBHOOK_PATH}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
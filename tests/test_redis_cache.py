@@ -0,0 +1,131 @@
+# test_redis_cache.py
+#
+# RedisCache against a local Redis stand-in (fakeredis's TCP server), so no Redis install is needed:
+#
+#   pip install pytest fakeredis
+#   python -m pytest tests/
+
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from comparator.order_cache import MISSING
+from comparator.redis_cache import RedisCache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ==========================================
+# 🧪 Fixtures
+# ==========================================
+
+@pytest.fixture
+def redis_url():
+    server = fakeredis.TcpFakeServer(("127.0.0.1", 0), server_type="redis")
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.server_address[1]}/0"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def cache(redis_url):
+    return RedisCache(redis_url)
+
+# ==========================================
+# 🗄️ Entries
+# ==========================================
+
+def test_get_returns_what_was_set(cache):
+    cache.set("order", {"id": 1, "items": ["a", None]}, 60)
+    assert cache.get("order") == {"id": 1, "items": ["a", None]}
+    assert cache.get("unknown") is MISSING
+
+def test_none_is_a_cached_value(cache):
+    cache.set("image", None, 60)
+    assert cache.get("image") is None
+
+def test_expired_entry_is_a_miss(cache):
+    cache.set("order", [1], 0.2)
+    time.sleep(0.3)
+    assert cache.get("order") is MISSING
+
+def test_stale_entry_keeps_its_validators(cache):
+    cache.set("order", {"id": 1}, 0.2, [{"etag": "\"abc\""}])
+    time.sleep(0.3)
+    assert cache.get("order") is MISSING
+    assert cache.get_stale("order") == ({"id": 1}, [{"etag": "\"abc\""}])
+
+def test_entry_without_validators_is_not_stale(cache):
+    cache.set("order", {"id": 1}, 60)
+    assert cache.get_stale("order") is MISSING
+
+def test_touch_refreshes_an_expired_entry(cache):
+    cache.set("order", {"id": 1}, 0.2, [{"etag": "\"abc\""}])
+    time.sleep(0.3)
+    cache.touch("order", 60)
+    assert cache.get("order") == {"id": 1}
+
+def test_touch_of_a_missing_entry_creates_nothing(cache):
+    cache.touch("order", 60)
+    assert cache.get("order") is MISSING
+    assert cache.get_stale("order") is MISSING
+
+def test_delete(cache):
+    cache.set("order", {"id": 1}, 60, [{"etag": "\"abc\""}])
+    cache.delete("order")
+    assert cache.get("order") is MISSING
+    assert cache.get_stale("order") is MISSING
+
+# ==========================================
+# 🔒 Locks
+# ==========================================
+
+def test_lock_is_exclusive_until_released(cache):
+    owner = cache.acquire_lock("lock:token")
+    assert owner is not None
+    assert cache.acquire_lock("lock:token") is None
+    cache.release_lock("lock:token", owner)
+    assert cache.acquire_lock("lock:token") is not None
+
+def test_release_by_another_owner_keeps_the_lock(cache):
+    owner = cache.acquire_lock("lock:token")
+    cache.release_lock("lock:token", "someone else")
+    assert cache.acquire_lock("lock:token") is None
+    cache.release_lock("lock:token", owner)
+
+def test_lock_expires(cache):
+    assert cache.acquire_lock("lock:token", ttl=0.2) is not None
+    time.sleep(0.3)
+    assert cache.acquire_lock("lock:token") is not None
+
+# 🔒 Several processes miss the token at once; exactly one of them fetches it
+def test_token_is_fetched_once_across_processes(redis_url):
+    worker = textwrap.dedent("""
+        import time
+        from comparator.order_cache import get_or_create_shared
+
+        def fetch_token():
+            print("fetched", flush=True)
+            time.sleep(0.5)
+            return "token"
+
+        print(get_or_create_shared("catkissfish:token", 60, fetch_token), flush=True)
+    """)
+    environment = dict(os.environ, REDIS_URL=redis_url)
+    workers = [
+        subprocess.Popen([sys.executable, "-c", worker], cwd=REPO_ROOT, env=environment, stdout=subprocess.PIPE, text=True)
+        for _ in range(6)
+    ]
+    outputs = [process.communicate(timeout=60)[0].split() for process in workers]
+
+    assert all(process.returncode == 0 for process in workers)
+    assert all(output[-1] == "token" for output in outputs)
+    assert sum(output.count("fetched") for output in outputs) == 1
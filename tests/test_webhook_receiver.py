@@ -0,0 +1,127 @@
+# test_webhook_receiver.py
+#
+# Webhook verification and caching against a recorded orders/updated delivery (saved with
+# --record and signed with the test secret below), on a throwaway SQLite shared cache:
+#
+#   python -m pytest tests/test_webhook_receiver.py
+
+import json
+import os
+import queue
+
+import pytest
+
+from comparator import webhook_receiver
+from comparator.config import SHOPIFY_STORES
+from comparator.order_cache import MISSING, SharedCache, shopify_order_cache_key
+from comparator.webhook_receiver import handle_webhook, is_superseded, sign_webhook_body, verify_webhook_hmac
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+WEBHOOK_SECRET = "test-webhook-secret"
+SHOP_DOMAIN = "catkissfish-test.myshopify.com"
+
+# ==========================================
+# 🧪 Fixtures
+# ==========================================
+
+@pytest.fixture
+def delivery():
+    with open(os.path.join(FIXTURES_DIR, "orders_updated.json"), encoding="utf-8") as fixture_file:
+        recorded = json.load(fixture_file)
+    return recorded["topic"], recorded["shop_domain"], recorded["hmac"], recorded["body"].encode("utf-8")
+
+@pytest.fixture(autouse=True)
+def store(monkeypatch):
+    monkeypatch.setitem(SHOPIFY_STORES, "G", {"url": SHOP_DOMAIN, "access_token": "test-token", "webhook_secret": WEBHOOK_SECRET})
+
+@pytest.fixture(autouse=True)
+def shared_cache(monkeypatch, tmp_path):
+    cache = SharedCache(str(tmp_path / "order_cache.sqlite3"))
+    monkeypatch.setattr(webhook_receiver, "get_shared_cache", lambda: cache)
+    monkeypatch.setattr(webhook_receiver, "variant_image_queue", queue.Queue())
+    return cache
+
+# 📬 Re-sign a changed order the way Shopify would
+def signed_delivery(order):
+    body = json.dumps(order).encode("utf-8")
+    return "orders/updated", SHOP_DOMAIN, sign_webhook_body(body, WEBHOOK_SECRET), body
+
+def cached_orders(shared_cache):
+    return shared_cache.get(shopify_order_cache_key("G", "G61226"))
+
+# ==========================================
+# 🔐 Verification
+# ==========================================
+
+def test_recorded_signature_is_valid(delivery):
+    _, _, hmac_header, body = delivery
+    assert verify_webhook_hmac(body, hmac_header, WEBHOOK_SECRET)
+
+def test_tampered_body_or_wrong_secret_is_rejected(delivery):
+    _, _, hmac_header, body = delivery
+    assert not verify_webhook_hmac(body.replace(b"10115", b"10117"), hmac_header, WEBHOOK_SECRET)
+    assert not verify_webhook_hmac(body, hmac_header, "another-secret")
+    assert not verify_webhook_hmac(body, "", WEBHOOK_SECRET)
+    assert not verify_webhook_hmac(body, hmac_header, None)
+
+def test_bad_signature_caches_nothing(delivery, shared_cache):
+    topic, shop_domain, _, body = delivery
+    assert handle_webhook(topic, shop_domain, sign_webhook_body(body, "another-secret"), body) == (401, "HMAC verification failed")
+    assert cached_orders(shared_cache) is MISSING
+
+def test_unknown_shop_domain_is_rejected(delivery, shared_cache):
+    topic, _, hmac_header, body = delivery
+    status, message = handle_webhook(topic, "someone-else.myshopify.com", hmac_header, body)
+    assert status == 404
+    assert "someone-else.myshopify.com" in message
+    assert cached_orders(shared_cache) is MISSING
+
+# ==========================================
+# 📬 Caching
+# ==========================================
+
+def test_delivery_is_cached_without_shipping_lines(delivery, shared_cache):
+    assert handle_webhook(*delivery) == (200, "Cached order #G61226 for store 'G'")
+    orders = cached_orders(shared_cache)
+    assert [item["name"] for item in orders[0]["line_items"]] == ["Custom Cat Shirt - M"]
+    assert orders[0]["shipping_address"]["zip"] == "10115"
+    assert "email" not in orders[0]  # Cached projected, like fetched orders
+    assert webhook_receiver.variant_image_queue.get_nowait() == ("G", 44012345678901)
+    assert webhook_receiver.variant_image_queue.empty()
+
+def test_order_with_only_shipping_lines_is_dropped(delivery, shared_cache):
+    handle_webhook(*delivery)
+    order = json.loads(delivery[3])
+    order["updated_at"] = "2024-09-11T15:00:00+02:00"
+    order["line_items"] = [item for item in order["line_items"] if item["name"] == "Versand"]
+    assert handle_webhook(*signed_delivery(order)) == (200, "Order #G61226 has no comparable products")
+    assert cached_orders(shared_cache) is MISSING
+
+# ==========================================
+# 🕰️ Late Deliveries
+# ==========================================
+
+def test_late_delivery_does_not_overwrite_a_newer_order(delivery, shared_cache):
+    newer_order = json.loads(delivery[3])
+    newer_order["updated_at"] = "2024-09-11T12:30:00Z"  # 14:30 in the recorded delivery's +02:00
+    newer_order["shipping_address"]["zip"] = "10117"
+    handle_webhook(*signed_delivery(newer_order))
+
+    assert handle_webhook(*delivery) == (200, "Ignored delivery of order #G61226 older than the cached one")
+    assert cached_orders(shared_cache)[0]["shipping_address"]["zip"] == "10117"
+
+def test_newer_delivery_replaces_the_cached_order(delivery, shared_cache):
+    handle_webhook(*delivery)
+    newer_order = json.loads(delivery[3])
+    newer_order["updated_at"] = "2024-09-11T15:00:00+02:00"
+    newer_order["shipping_address"]["zip"] = "10117"
+    assert handle_webhook(*signed_delivery(newer_order))[0] == 200
+    assert cached_orders(shared_cache)[0]["shipping_address"]["zip"] == "10117"
+
+def test_is_superseded_needs_two_comparable_timestamps():
+    cached = [{"updated_at": "2024-09-11T14:00:00+02:00"}]
+    assert is_superseded({"updated_at": "2024-09-11T13:00:00+02:00"}, cached)
+    assert not is_superseded({"updated_at": "2024-09-11T14:00:00+02:00"}, cached)
+    assert not is_superseded({"updated_at": "2024-09-11T13:00:00+02:00"}, MISSING)
+    assert not is_superseded({}, cached)
+    assert not is_superseded({"updated_at": "2024-09-11T13:00:00+02:00"}, [{"updated_at": "not a date"}])